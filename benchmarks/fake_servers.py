@@ -0,0 +1,141 @@
+import json
+import random
+import struct
+import asyncio
+
+from core.probes import A2S_INFO_REQUEST
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Stand-In Game Servers
+# ---------------------------------------------------------------------------------------------------------------------
+# Local endpoints that answer the probes in core/probes.py, so the monitoring code can be exercised without real game
+# servers. Every server binds its own port on 127.0.0.1, waits `latency` seconds before each reply and drops a request
+# outright with probability `loss`. A loss of 1.0 makes a black-hole that never answers. TCP connects are completed by
+# the kernel, so latency and loss only apply to what a server sends back, not to the connection itself.
+
+PLAYERS = 3
+MAX_PLAYERS = 20
+
+
+def a2s_info_reply(name):
+    """A minimal A2S_INFO response (header 'I')."""
+    return (b'\xFF\xFF\xFF\xFFI\x11' + name.encode() + b'\x00' + b'map\x00' + b'folder\x00' + b'game\x00' +
+            struct.pack('<hBBB', 0, PLAYERS, MAX_PLAYERS, 0) + b'dl\x00\x00')
+
+
+class _FakeServer:
+
+    def __init__(self, latency=0.0, loss=0.0):
+        self.latency = latency
+        self.loss = loss
+        self.requests = 0
+        self.server = None
+        self.port = None
+
+    def dropped(self):
+        self.requests += 1
+        return random.random() < self.loss
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+
+class FakeUDPServer(_FakeServer, asyncio.DatagramProtocol):
+    """Answers A2S_INFO with a challenge handshake like current Source servers, and echoes any other datagram."""
+
+    def __init__(self, latency=0.0, loss=0.0, challenge=True):
+        super().__init__(latency, loss)
+        self.challenge = challenge
+        self.token = random.getrandbits(32).to_bytes(4, 'little')
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.server, _ = await loop.create_datagram_endpoint(lambda: self, local_addr=('127.0.0.1', 0))
+        self.port = self.server.get_extra_info('sockname')[1]
+        return self
+
+    def reply(self, data):
+        if not data.startswith(A2S_INFO_REQUEST):
+            return data
+        if self.challenge and data[len(A2S_INFO_REQUEST):] != self.token:
+            return b'\xFF\xFF\xFF\xFFA' + self.token
+        return a2s_info_reply(f"Fake {self.port}")
+
+    def datagram_received(self, data, addr):
+        if self.dropped() or self.server is None:
+            return
+        reply = self.reply(data)
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self.send, reply, addr)
+        else:
+            self.send(reply, addr)
+
+    def send(self, data, addr):
+        if self.server is not None:
+            self.server.sendto(data, addr)
+
+
+class FakeTCPServer(_FakeServer):
+    """Accepts connections and closes them; enough for the TCP connect probe."""
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def handle(self, reader, writer):
+        self.requests += 1
+        writer.close()
+
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        out.append(byte | (0x80 if value else 0))
+        if not value:
+            return bytes(out)
+
+
+async def _read_varint(reader):
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value
+    raise ValueError("VarInt too long")
+
+
+class FakeMinecraftServer(_FakeServer):
+    """Answers a Minecraft Java Server List Ping status request. Dropped requests are held open until the client quits."""
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def handle(self, reader, writer):
+        try:
+            for _ in range(2):  # Handshake, then status request
+                await reader.readexactly(await _read_varint(reader))
+            if self.dropped():
+                await reader.read()
+                return
+
+            await asyncio.sleep(self.latency)
+            body = json.dumps({
+                "version": {"name": "1.20.4", "protocol": 765},
+                "players": {"max": MAX_PLAYERS, "online": PLAYERS},
+                "description": {"text": f"Fake {self.port}"}
+            }).encode()
+            packet = _varint(0) + _varint(len(body)) + body
+            writer.write(_varint(len(packet)) + packet)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,108 @@
+import time
+import random
+import asyncio
+import resource
+import threading
+
+from benchmarks.fake_servers import FakeMinecraftServer, FakeTCPServer, FakeUDPServer
+from cogs.server_updates import probe_target
+from cogs.server_updates_extra import server_target
+from core.monitor import MAX_CONCURRENT_PROBES, ProbeScheduler
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Probe Engine Benchmark
+# ---------------------------------------------------------------------------------------------------------------------
+# Run from the repository root with: python -m benchmarks.probe_bench
+# Starts TARGETS local stand-in servers (see fake_servers.py) and registers them with a probe scheduler the way both
+# server status cogs do: every target once through ServerUpdatesCog's probe_target() and once through a
+# ServerUpdatesExtraCog servers row, so each should be probed once. Every scenario then forces ROUNDS full ticks and
+# reports the tick duration, probes per second, how many targets were seen up, and the most threads alive at once.
+
+TARGETS = 1200
+ROUNDS = 3
+
+# Share of targets per kind: (game as the status board stores it, probe type as a servers row stores it, fake server)
+TARGET_MIX = [
+    (0.25, "valheim", "steam", FakeUDPServer),
+    (0.20, "enshrouded", "steam", FakeUDPServer),
+    (0.20, "palworld", "udp", FakeUDPServer),
+    (0.15, "scp", "tcp", FakeTCPServer),
+    (0.20, "minecraft", "minecraft", FakeMinecraftServer),
+]
+
+# (name, mean reply latency in seconds, loss per request, share of black-holes)
+SCENARIOS = [
+    ("instant replies", 0.0, 0.0, 0.0),
+    ("50ms replies, 2% loss", 0.05, 0.02, 0.0),
+    ("50ms replies, 2% loss, 2% black-holes", 0.05, 0.02, 0.02),
+]
+
+
+async def start_servers(latency, loss, black_holes):
+    servers = []
+    for share, game, probe_type, server_class in TARGET_MIX:
+        for _ in range(int(TARGETS * share)):
+            dead = random.random() < black_holes
+            server = server_class(latency=random.uniform(0.5, 1.5) * latency, loss=1.0 if dead else loss)
+            servers.append((game, probe_type, await server.start()))
+    return servers
+
+
+def register(scheduler, servers):
+    for row_id, (game, probe_type, server) in enumerate(servers):
+        # Valheim is queried on the port after its game port, so the board stores the game port
+        port = server.port - 1 if game == "valheim" else server.port
+        scheduler.register(probe_target(game, "127.0.0.1", port), ("ServerUpdatesCog", 1))
+
+        row = (row_id, 1, f"server-{row_id}", "127.0.0.1", probe_type, server.port, 0)
+        scheduler.register(server_target(row), ("ServerUpdatesExtraCog", row_id))
+
+
+async def sample_threads(peak):
+    while True:
+        peak[0] = max(peak[0], threading.active_count())
+        await asyncio.sleep(0.01)
+
+
+async def run_scenario(name, latency, loss, black_holes):
+    servers = await start_servers(latency, loss, black_holes)
+    scheduler = ProbeScheduler()
+    register(scheduler, servers)
+
+    peak = [threading.active_count()]
+    sampler = asyncio.create_task(sample_threads(peak))
+    durations = []
+    up = 0
+    try:
+        for _ in range(ROUNDS):
+            for target in scheduler.targets.values():
+                target.next_probe_at = 0
+            started = time.perf_counter()
+            await scheduler.tick()
+            durations.append(time.perf_counter() - started)
+            up = sum(1 for target in scheduler.targets.values() if target.result and target.result.online)
+    finally:
+        sampler.cancel()
+        for _, _, server in servers:
+            server.close()
+
+    tick = sum(durations) / len(durations)
+    print(f"{name}:")
+    print(f"  {len(scheduler.targets)} targets from {len(servers) * 2} registrations, "
+          f"{MAX_CONCURRENT_PROBES} probes in flight at most")
+    print(f"  tick {tick * 1000:7.0f} ms mean, {min(durations) * 1000:.0f}-{max(durations) * 1000:.0f} ms range, "
+          f"{len(scheduler.targets) / tick:8.0f} probes/s")
+    print(f"  {up} up after the last tick, {peak[0]} threads at most")
+
+
+async def main():
+    # One socket per stand-in server plus the probes' own sockets
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, min(hard, TARGETS * 4)), hard))
+
+    for scenario in SCENARIOS:
+        await run_scenario(*scenario)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
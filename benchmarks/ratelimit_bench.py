@@ -0,0 +1,104 @@
+import random
+import time
+import tracemalloc
+
+from core.ratelimit import RateLimiter
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Rate Limiter Micro-Benchmark
+# ---------------------------------------------------------------------------------------------------------------------
+# Run from the repository root with: python -m benchmarks.ratelimit_bench
+# Prints the mean cost of a single hit() as the number of tracked keys grows. The figure should stay flat. Then
+# measures idle-key eviction: keys are hit and go quiet, and the timer wheel must drop them once their window has
+# passed, so memory follows the keys active within the last window rather than every key ever seen.
+
+HITS_PER_KEY = 20
+
+# Limiter window used by every scenario, in simulated seconds
+WINDOW = 10
+
+# Idle-key churn: NEW_KEYS_PER_SECOND fresh keys are each hit IDLE_HITS times, then never again, for CHURN_SECONDS
+NEW_KEYS_PER_SECOND = 2_000
+IDLE_HITS = 3
+CHURN_SECONDS = 60
+
+
+def bench(key_count, buckets=None):
+    limiter = RateLimiter(window=WINDOW, buckets=buckets)
+    keys = [(random.getrandbits(63), random.getrandbits(63), "channels_deleted") for _ in range(key_count)]
+    events = key_count * HITS_PER_KEY
+
+    # Every key is hit once per simulated second, so each one sees the same traffic whatever the key count
+    now = 0.0
+    step = 1 / key_count
+    start = time.perf_counter()
+    for i in range(events):
+        now += step
+        limiter.hit(keys[i % key_count], now)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / events * 1e9, len(limiter)
+
+
+def new_keys(count):
+    return [(random.getrandbits(63), random.getrandbits(63), "channels_deleted") for _ in range(count)]
+
+
+def bench_idle_eviction(key_count, buckets=None):
+    """Hit `key_count` keys, let them all go idle, and measure memory and key count before and after eviction."""
+    keys = new_keys(key_count)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    limiter = RateLimiter(window=WINDOW, buckets=buckets)
+    for hit in range(IDLE_HITS):
+        for key in keys:
+            limiter.hit(key, hit * 0.1)
+    before_keys, before_memory = len(limiter), tracemalloc.get_traced_memory()[0] - baseline
+
+    # The first call once every window has passed collects all of the idle keys
+    start = time.perf_counter()
+    limiter.evict(WINDOW + 2 * limiter.wheel.tick)
+    evict_ms = (time.perf_counter() - start) * 1000
+    after_keys, after_memory = len(limiter), tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return before_keys, before_memory, after_keys, after_memory, evict_ms
+
+
+def bench_churn(buckets=None):
+    """Keep bringing in fresh keys that go idle, and report the most keys and memory ever held at once."""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    limiter = RateLimiter(window=WINDOW, buckets=buckets)
+    peak_keys = peak_memory = 0
+    for second in range(CHURN_SECONDS):
+        keys = new_keys(NEW_KEYS_PER_SECOND)
+        for hit in range(IDLE_HITS):
+            for key in keys:
+                limiter.hit(key, second + hit * 0.1)
+        peak_keys = max(peak_keys, len(limiter))
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[0] - baseline)
+    tracemalloc.stop()
+    return NEW_KEYS_PER_SECOND * CHURN_SECONDS, peak_keys, peak_memory
+
+
+def main():
+    for buckets in (None, 60):
+        label = "deque windows" if buckets is None else f"{buckets}-bucket counters"
+        print(f"{label}:")
+        for key_count in (1_000, 10_000, 100_000):
+            ns_per_hit, live_keys = bench(key_count, buckets)
+            print(f"  {key_count:>7} keys: {ns_per_hit:7.0f} ns/hit, {live_keys:>7} keys live at end")
+
+        for key_count in (10_000, 100_000):
+            before_keys, before_memory, after_keys, after_memory, evict_ms = bench_idle_eviction(key_count, buckets)
+            print(f"  {key_count:>7} idle keys: {before_keys:>7} live / {before_memory / 2 ** 20:6.1f} MiB before "
+                  f"eviction, {after_keys:>7} live / {after_memory / 2 ** 20:6.1f} MiB after ({evict_ms:.0f} ms)")
+
+        seen, peak_keys, peak_memory = bench_churn(buckets)
+        print(f"  churn over {CHURN_SECONDS}s: {seen} keys seen, at most {peak_keys} live / "
+              f"{peak_memory / 2 ** 20:.1f} MiB at once")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import statistics
+import time
+
+from io import BytesIO
+from PIL import Image, ImageFilter
+
+from core.welcome import (IMAGE_FORMATS, WelcomeRenderSpec, WelcomeTemplate, compose_welcome_image, encode_image,
+                          prepare_background)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Welcome Encoding Benchmark
+# ---------------------------------------------------------------------------------------------------------------------
+# Run from the repository root with: python -m benchmarks.welcome_encoding_bench
+# Renders a welcome image on a plain colour background and on a photo-like background, then reports the encode time
+# and encoded size of every output format and quality a guild can choose.
+
+ENCODES = 50
+QUALITIES = (50, 80, 95)
+
+
+def make_avatar():
+    avatar = Image.frombytes('RGB', (64, 64), os.urandom(64 * 64 * 3)).resize((128, 128), Image.BICUBIC)
+    buffer = BytesIO()
+    avatar.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def make_photo_background():
+    # Blurred noise over a gradient compresses roughly like a real photo, unlike raw noise or flat colour
+    noise = Image.frombytes('RGB', (500, 250), os.urandom(500 * 250 * 3)).filter(ImageFilter.GaussianBlur(3))
+    gradient = Image.linear_gradient('L').resize((500, 250)).convert('RGB')
+    buffer = BytesIO()
+    Image.blend(noise, gradient, 0.5).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def measure(image, image_format, quality):
+    timings = []
+    for _ in range(ENCODES):
+        started = time.perf_counter()
+        data = encode_image(image, image_format, quality)
+        timings.append(time.perf_counter() - started)
+    return statistics.mean(timings) * 1000, len(data)
+
+
+def main():
+    avatar = make_avatar()
+    photo_mode, photo_pixels = prepare_background(make_photo_background())
+    cases = [
+        ("colour background", WelcomeTemplate((0, 0), "'{member}' has just joined", "#000000", "#C891F9", "#EDDCFE")),
+        ("photo background", WelcomeTemplate((0, 1), "'{member}' has just joined", "#000000", "#C891F9", "#EDDCFE",
+                                             photo_pixels, photo_mode)),
+    ]
+
+    for label, template in cases:
+        image = compose_welcome_image(WelcomeRenderSpec(template=template, avatar=avatar, display_name="member"))
+        print(f"{label}:")
+        print(f"  {'format':<15}{'quality':>8}{'encode':>10}{'size':>11}")
+        for image_format in IMAGE_FORMATS:
+            qualities = QUALITIES if image_format in ('webp', 'png_quantized') else (None,)
+            for quality in qualities:
+                encode_ms, size = measure(image, image_format, quality or 80)
+                print(f"  {image_format:<15}{quality or '-':>8}{encode_ms:>8.2f}ms{size / 1024:>8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import statistics
+import time
+
+from io import BytesIO
+from PIL import Image
+
+from core.welcome import RenderPool, WelcomeRenderSpec, WelcomeTemplate, render_welcome_image
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Welcome Render Benchmark
+# ---------------------------------------------------------------------------------------------------------------------
+# Run from the repository root with: python -m benchmarks.welcome_render_bench
+# Simulates a burst of joins and reports per-join latency and event loop lag, rendering inline on the loop (the old
+# behaviour) and through RenderPool.
+
+JOINS = 40
+LAG_INTERVAL = 0.005
+
+TEMPLATE = WelcomeTemplate(
+    key=(0, 0),
+    text_overlay="'{member}' has just joined the server",
+    text_color="#000000",
+    avatar_ring_colour="#C891F9",
+    background_colour="#EDDCFE"
+)
+
+
+def make_spec(index):
+    avatar = Image.frombytes('RGB', (512, 512), os.urandom(512 * 512 * 3))
+    buffer = BytesIO()
+    avatar.save(buffer, "PNG")
+    return WelcomeRenderSpec(template=TEMPLATE, avatar=buffer.getvalue(), display_name=f"member-{index}")
+
+
+async def measure_lag(stop, samples):
+    # Sleeps for a fixed interval and records how late the loop was in waking it up
+    while not stop.is_set():
+        expected = time.perf_counter() + LAG_INTERVAL
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(0.0, time.perf_counter() - expected))
+
+
+async def run(label, render, specs):
+    stop = asyncio.Event()
+    lag = []
+    monitor = asyncio.create_task(measure_lag(stop, lag))
+    await asyncio.sleep(0.05)
+
+    async def join(index, spec):
+        started = time.perf_counter()
+        await render(index, spec)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(join(index, spec) for index, spec in enumerate(specs)))
+    total = time.perf_counter() - started
+
+    stop.set()
+    await monitor
+
+    latencies = sorted(latencies)
+    print(f"{label}:")
+    print(f"  burst of {len(specs)} joins took {total * 1000:.0f}ms")
+    print(f"  join latency: median {statistics.median(latencies) * 1000:.0f}ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f}ms")
+    print(f"  loop lag: mean {statistics.mean(lag) * 1000:.1f}ms, max {max(lag) * 1000:.1f}ms")
+
+
+async def main():
+    specs = [make_spec(index) for index in range(JOINS)]
+
+    async def render_inline(index, spec):
+        render_welcome_image(spec)
+        await asyncio.sleep(0)
+
+    await run("inline on the event loop", render_inline, specs)
+
+    pool = RenderPool(max_pending=JOINS)
+    pool.start()
+    await asyncio.sleep(0.5)  # Let the workers finish forking
+
+    async def render_pooled(index, spec):
+        await pool.render(index, spec)
+
+    await run(f"RenderPool ({pool.workers} workers)", render_pooled, specs)
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
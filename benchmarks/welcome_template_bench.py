@@ -0,0 +1,107 @@
+import os
+import statistics
+import time
+
+from io import BytesIO
+from PIL import Image, ImageDraw, ImageFont
+
+from core.welcome import (DEFAULT_BACKGROUND_SIZE, FONT_PATH, WelcomeRenderSpec, WelcomeTemplate, prepare_background,
+                          render_welcome_image)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Welcome Template Benchmark
+# ---------------------------------------------------------------------------------------------------------------------
+# Run from the repository root with: python -m benchmarks.welcome_template_bench
+# Compares the CPU time of one welcome render before templates (masks, ring and font built on every join) with a render
+# from a compiled per-guild template, for a plain colour background and for a background image.
+
+RENDERS = 200
+AVATAR_SIZE = 128
+
+
+def make_avatar():
+    avatar = Image.frombytes('RGB', (AVATAR_SIZE, AVATAR_SIZE), os.urandom(AVATAR_SIZE * AVATAR_SIZE * 3))
+    buffer = BytesIO()
+    avatar.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def make_background():
+    background = Image.frombytes('RGB', (1000, 500), os.urandom(1000 * 500 * 3))
+    buffer = BytesIO()
+    background.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def legacy_render(avatar, background_data, display_name):
+    # The per-join work done before templates, kept here as the baseline
+    if background_data:
+        background = Image.open(BytesIO(background_data)).resize(DEFAULT_BACKGROUND_SIZE, Image.LANCZOS)
+    else:
+        background = Image.new('RGB', DEFAULT_BACKGROUND_SIZE, color="#EDDCFE")
+
+    initial_size = 400
+    border_size = 20
+    final_size = 100
+
+    avatar_image = Image.open(BytesIO(avatar)).resize((initial_size, initial_size)).convert("RGBA")
+    mask = Image.new('L', (initial_size, initial_size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, initial_size, initial_size), fill=255)
+    avatar_image.putalpha(mask)
+
+    bordered_size = initial_size + border_size * 2
+    bordered_image = Image.new('RGBA', (bordered_size, bordered_size), "#C891F9")
+    bordered_image.paste(avatar_image, (border_size, border_size), avatar_image)
+    border_mask = Image.new('L', (bordered_size, bordered_size), 0)
+    ImageDraw.Draw(border_mask).ellipse((0, 0, bordered_size, bordered_size), fill=255)
+    bordered_image.putalpha(border_mask)
+    final_image = bordered_image.resize((final_size, final_size), Image.LANCZOS)
+
+    background_position = ((background.width - final_size) // 2, 50)
+    background.paste(final_image, background_position, final_image)
+
+    draw = ImageDraw.Draw(background)
+    font = ImageFont.truetype(FONT_PATH, 24)
+    text = "'{member}' has just joined the server".replace("{member}", display_name)
+    text_bbox = draw.textbbox((0, 0), text, font=font)
+    text_position = ((background.width - (text_bbox[2] - text_bbox[0])) // 2, background_position[1] + final_size + 10)
+    draw.text(text_position, text, fill="#000000", font=font)
+
+    buffer = BytesIO()
+    background.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def measure(render):
+    timings = []
+    for index in range(RENDERS):
+        started = time.process_time()
+        render(index)
+        timings.append(time.process_time() - started)
+    return statistics.mean(timings) * 1000
+
+
+def main():
+    avatar = make_avatar()
+    background_data = make_background()
+    background_mode, background_pixels = prepare_background(background_data)
+
+    cases = [
+        ("colour background", None, WelcomeTemplate((0, 0), "'{member}' has just joined the server", "#000000",
+                                                     "#C891F9", "#EDDCFE")),
+        ("image background", background_data, WelcomeTemplate((0, 1), "'{member}' has just joined the server",
+                                                              "#000000", "#C891F9", "#EDDCFE", background_pixels,
+                                                              background_mode)),
+    ]
+
+    for label, legacy_background, template in cases:
+        legacy = measure(lambda index: legacy_render(avatar, legacy_background, f"member-{index}"))
+        templated = measure(lambda index: render_welcome_image(
+            WelcomeRenderSpec(template=template, avatar=avatar, display_name=f"member-{index}")))
+        print(f"{label}:")
+        print(f"  rebuilt per join:  {legacy:.2f}ms CPU per render")
+        print(f"  compiled template: {templated:.2f}ms CPU per render ({legacy / templated:.1f}x less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,193 +1,230 @@
-import discord
-import logging
-import aiosqlite
-import time
-from discord.ext import commands
-from discord.ui import Button, View
-
-# ----------------------------------------------------------------------------------------------------------------------
-# Database Configuration
-# ----------------------------------------------------------------------------------------------------------------------
-db_path = './data/databases/serverfriend.db'
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Logging Configuration
-# ---------------------------------------------------------------------------------------------------------------------
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# ----------------------------------------------------------------------------------------------------------------------
-# Views
-# ----------------------------------------------------------------------------------------------------------------------
-class ActionView(View):
-    def __init__(self, user_id, guild_id, cog):
-        super().__init__(timeout=None)
-        self.user_id = user_id
-        self.guild_id = guild_id
-        self.cog = cog
-
-    @discord.ui.button(label="Restore User", style=discord.ButtonStyle.success)
-    async def restore_button_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
-        guild = interaction.guild
-        user = guild.get_member(self.user_id)
-        if user:
-            await self.cog.restore_user_roles(guild, user)
-            await interaction.response.send_message(f"{user.mention} has been restored.", ephemeral=True)
-        else:
-            await interaction.response.send_message("User not found.", ephemeral=True)
-        # Delete the embed message after the action
-        await interaction.message.delete()
-
-    @discord.ui.button(label="Kick User", style=discord.ButtonStyle.danger)
-    async def kick_button_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
-        guild = interaction.guild
-        user = guild.get_member(self.user_id)
-        if user:
-            await guild.kick(user, reason="Spamming")
-            await interaction.response.send_message(f"{user.mention} has been kicked.", ephemeral=True)
-        else:
-            await interaction.response.send_message("User not found.", ephemeral=True)
-        # Delete the embed message after the action
-        await interaction.message.delete()
-
-    @discord.ui.button(label="Ban User", style=discord.ButtonStyle.danger)
-    async def ban_button_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
-        guild = interaction.guild
-        user = guild.get_member(self.user_id)
-        if user:
-            await guild.ban(user, reason="Spamming")
-            await interaction.response.send_message(f"{user.mention} has been banned.", ephemeral=True)
-        else:
-            await interaction.response.send_message("User not found.", ephemeral=True)
-        # Delete the embed message after the action
-        await interaction.message.delete()
-
-    @discord.ui.button(label="Dismiss", style=discord.ButtonStyle.secondary)
-    async def dismiss_button_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # Simply delete the embed message
-        await interaction.message.delete()
-
-
-# ----------------------------------------------------------------------------------------------------------------------
-# AntiSpamCog Class
-# ----------------------------------------------------------------------------------------------------------------------
-
-class AntiSpamCog(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.user_message_log = {}
-        self.spam_threshold = 5
-        self.time_frame = 3
-        self.restricted_users = {}
-
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
-
-        now = time.time()
-        user_id = message.author.id
-
-        if user_id not in self.user_message_log:
-            self.user_message_log[user_id] = []
-
-        self.user_message_log[user_id] = [msg_time for msg_time in self.user_message_log[user_id] if now - msg_time < self.time_frame]
-        self.user_message_log[user_id].append(now)
-
-        if len(self.user_message_log[user_id]) > self.spam_threshold:
-            await self.handle_spam(message)
-
-    async def handle_spam(self, message):
-        user = message.author
-        guild = message.guild
-        if user.id in self.restricted_users:
-            return  # Skip if the user is already restricted
-
-        logger.warning(f"User {user.name} ({user.id}) detected as spamming in guild {guild.name} ({guild.id}).")
-        await self.restrict_user_permissions(guild, user)
-        await self.log_restriction(guild, user, "Spamming")
-
-    async def restrict_user_permissions(self, guild, user):
-        restricted_role = discord.utils.get(guild.roles, name="Restricted")
-        if not restricted_role:
-            restricted_role = await guild.create_role(name="Restricted", permissions=discord.Permissions.none())
-
-        role_ids = [role.id for role in user.roles if role != guild.default_role]
-
-        async with aiosqlite.connect(db_path) as db:
-            await db.execute('''
-                INSERT INTO restricted_users (user_id, guild_id, role_ids) 
-                VALUES (?, ?, ?) 
-                ON CONFLICT(user_id, guild_id) DO UPDATE SET role_ids = excluded.role_ids
-            ''', (user.id, guild.id, ','.join(map(str, role_ids))))
-            await db.commit()
-
-        await user.remove_roles(*[role for role in user.roles if role != guild.default_role], reason="Spamming")
-        await user.add_roles(restricted_role, reason="Spamming")
-        self.restricted_users[user.id] = time.time()  # Log the restriction time
-
-    async def restore_user_roles(self, guild, user):
-        async with aiosqlite.connect(db_path) as db:
-            cursor = await db.execute('''
-                SELECT role_ids FROM restricted_users WHERE user_id = ? AND guild_id = ?
-            ''', (user.id, guild.id))
-            result = await cursor.fetchone()
-
-        if result:
-            role_ids = [int(role_id) for role_id in result[0].split(',') if role_id.isdigit()]
-            roles = [discord.utils.get(guild.roles, id=role_id) for role_id in role_ids]
-            restricted_role = discord.utils.get(guild.roles, name="Restricted")
-
-            await user.remove_roles(restricted_role, reason="Restoring roles")
-            await user.add_roles(*roles, reason="Restoring roles")
-
-            async with aiosqlite.connect(db_path) as db:
-                await db.execute('DELETE FROM restricted_users WHERE user_id = ? AND guild_id = ?', (user.id, guild.id))
-                await db.commit()
-
-            if user.id in self.restricted_users:
-                del self.restricted_users[user.id]  # Clear the log for this user
-
-    async def log_restriction(self, guild, user, reason):
-        logs_channel = discord.utils.get(guild.text_channels, name="logs-restrictions")
-        if not logs_channel:
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(read_messages=False)
-            }
-            logs_channel = await guild.create_text_channel("logs-restrictions", overwrites=overwrites)
-
-        embed = discord.Embed(
-            title="User Restricted",
-            description=f"{user.mention} has been restricted.",
-            color=discord.Color.red()
-        )
-        embed.add_field(name="User ID", value=f"{user.id}", inline=False)
-        embed.add_field(name="Server", value=f"{guild.name}", inline=False)
-        embed.add_field(name="Server ID", value=f"{guild.id}", inline=False)
-        embed.add_field(name="Reason", value=reason, inline=False)
-        embed.set_footer(text=f"{user.name}", icon_url=user.avatar.url)
-        embed.timestamp = discord.utils.utcnow()
-
-        view = ActionView(user.id, guild.id, self)
-
-        await logs_channel.send(embed=embed, view=view)
-
-
-# ----------------------------------------------------------------------------------------------------------------------
-# Setup Function
-# ----------------------------------------------------------------------------------------------------------------------
-
-async def setup(bot):
-    async with aiosqlite.connect(db_path) as db:
-        await db.execute('''
-            CREATE TABLE IF NOT EXISTS restricted_users (
-                user_id INTEGER,
-                guild_id INTEGER,
-                role_ids TEXT,
-                PRIMARY KEY (user_id, guild_id)
-            )
-        ''')
-        await db.commit()
-
-    await bot.add_cog(AntiSpamCog(bot))
+import discord
+import logging
+import time
+from dataclasses import dataclass
+from discord import app_commands
+from discord.ext import commands
+from discord.ui import Button, View
+from core import db
+from core.ratelimit import MessageRateTracker, TTLCache
+from core.restriction import ensure_restricted_role, is_restricted, restore_member, restrict_member
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Spam Config
+# ----------------------------------------------------------------------------------------------------------------------
+@dataclass(frozen=True)
+class SpamConfig:
+    spam_threshold: int = 5
+    time_frame: int = 3
+
+
+DEFAULT_SPAM_CONFIG = SpamConfig()
+
+# Upper bounds for the settings command; time frames must stay below the tracker's idle TTL
+MAX_SPAM_THRESHOLD = 50
+MAX_TIME_FRAME = 60
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Views
+# ----------------------------------------------------------------------------------------------------------------------
+class ActionView(View):
+    def __init__(self, user_id, guild_id, cog):
+        super().__init__(timeout=None)
+        self.user_id = user_id
+        self.guild_id = guild_id
+        self.cog = cog
+
+    @discord.ui.button(label="Restore User", style=discord.ButtonStyle.success)
+    async def restore_button_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
+        guild = interaction.guild
+        user = guild.get_member(self.user_id)
+        if user:
+            await self.cog.restore_user_roles(guild, user)
+            await interaction.response.send_message(f"{user.mention} has been restored.", ephemeral=True)
+        else:
+            await interaction.response.send_message("User not found.", ephemeral=True)
+        # Delete the embed message after the action
+        await interaction.message.delete()
+
+    @discord.ui.button(label="Kick User", style=discord.ButtonStyle.danger)
+    async def kick_button_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
+        guild = interaction.guild
+        user = guild.get_member(self.user_id)
+        if user:
+            await guild.kick(user, reason="Spamming")
+            await interaction.response.send_message(f"{user.mention} has been kicked.", ephemeral=True)
+        else:
+            await interaction.response.send_message("User not found.", ephemeral=True)
+        # Delete the embed message after the action
+        await interaction.message.delete()
+
+    @discord.ui.button(label="Ban User", style=discord.ButtonStyle.danger)
+    async def ban_button_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
+        guild = interaction.guild
+        user = guild.get_member(self.user_id)
+        if user:
+            await guild.ban(user, reason="Spamming")
+            await interaction.response.send_message(f"{user.mention} has been banned.", ephemeral=True)
+        else:
+            await interaction.response.send_message("User not found.", ephemeral=True)
+        # Delete the embed message after the action
+        await interaction.message.delete()
+
+    @discord.ui.button(label="Dismiss", style=discord.ButtonStyle.secondary)
+    async def dismiss_button_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # Simply delete the embed message
+        await interaction.message.delete()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# AntiSpamCog Class
+# ----------------------------------------------------------------------------------------------------------------------
+
+class AntiSpamCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.spam_configs = {}  # guild_id -> SpamConfig, kept in sync by /antispam_settings
+        # (guild_id, user_id) -> last few message timestamps; idle users are dropped after two minutes
+        self.user_message_log = MessageRateTracker(maxsize=50_000, ttl=MAX_TIME_FRAME * 2)
+        # (guild_id, user_id) -> restriction time, only a fast path in front of the Restricted role check
+        self.restricted_users = TTLCache(maxsize=10_000, ttl=3600)
+
+    async def cog_load(self):
+        rows = await db.fetchall('SELECT guild_id, spam_threshold, time_frame FROM antispam_config')
+        self.spam_configs = {guild_id: SpamConfig(threshold, time_frame) for guild_id, threshold, time_frame in rows}
+        db.on_table_reset('antispam_config', self.forget_spam_configs)
+        db.on_table_reset('restricted_users', self.restricted_users.clear)
+
+    def cog_unload(self):
+        db.remove_table_reset('antispam_config', self.forget_spam_configs)
+        db.remove_table_reset('restricted_users', self.restricted_users.clear)
+
+    def forget_spam_configs(self):
+        self.spam_configs = {}
+
+    def get_spam_config(self, guild_id):
+        return self.spam_configs.get(guild_id, DEFAULT_SPAM_CONFIG)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.author.bot or message.guild is None:
+            return
+
+        triggered_at = time.perf_counter()
+        config = self.get_spam_config(message.guild.id)
+        key = (message.guild.id, message.author.id)
+        if self.user_message_log.hit(key, config.spam_threshold, config.time_frame):
+            await self.handle_spam(message, triggered_at)
+
+    async def handle_spam(self, message, triggered_at=None):
+        user = message.author
+        guild = message.guild
+        if (guild.id, user.id) in self.restricted_users:
+            return  # Skip if the user is already restricted
+
+        if is_restricted(user):
+            return  # Restricted before the cache entry expired; their stored roles must not be overwritten
+
+        logger.warning(f"User {user.name} ({user.id}) detected as spamming in guild {guild.name} ({guild.id}).")
+        elapsed = await self.restrict_user_permissions(guild, user, triggered_at)
+        if elapsed is not None:
+            await self.log_restriction(guild, user, "Spamming", elapsed)
+
+    async def restrict_user_permissions(self, guild, user, triggered_at=None):
+        # Marked first so messages arriving during the edit do not start a second restriction
+        self.restricted_users.set((guild.id, user.id), time.time())  # Log the restriction time
+        try:
+            # One role swap takes every permission away at once; the old roles are saved just before it
+            return await restrict_member(guild, user, "Spamming", triggered_at)
+        except discord.HTTPException:
+            self.restricted_users.pop((guild.id, user.id))
+            raise
+
+    async def restore_user_roles(self, guild, user):
+        if await restore_member(guild, user, "Restoring roles"):
+            self.restricted_users.pop((guild.id, user.id))  # Clear the log for this user
+            self.user_message_log.reset((guild.id, user.id))
+
+    @app_commands.command(name="antispam_settings", description="Admin: View or change the spam detection settings.")
+    @app_commands.describe(spam_threshold="Messages allowed inside the time frame",
+                           time_frame="Length of the time frame in seconds")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def antispam_settings(self, interaction: discord.Interaction,
+                                spam_threshold: app_commands.Range[int, 1, MAX_SPAM_THRESHOLD] = None,
+                                time_frame: app_commands.Range[int, 1, MAX_TIME_FRAME] = None):
+        config = self.get_spam_config(interaction.guild.id)
+
+        if spam_threshold is not None or time_frame is not None:
+            config = SpamConfig(spam_threshold or config.spam_threshold, time_frame or config.time_frame)
+            await db.execute('''
+                INSERT INTO antispam_config (guild_id, spam_threshold, time_frame) VALUES (?, ?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET spam_threshold = excluded.spam_threshold, time_frame = excluded.time_frame
+            ''', (interaction.guild.id, config.spam_threshold, config.time_frame))
+            self.spam_configs[interaction.guild.id] = config
+            try:
+                await ensure_restricted_role(interaction.guild)
+            except discord.HTTPException as e:
+                logger.error(f"Failed to prepare the Restricted role in {interaction.guild.name}: {e}")
+
+        await interaction.response.send_message(
+            f"`Spam threshold: {config.spam_threshold} messages in {config.time_frame}s`\n"
+            f"`Tracking {len(self.user_message_log)} users "
+            f"({self.user_message_log.memory_usage() / 1024:.1f} KiB)`", ephemeral=True)
+
+    async def log_restriction(self, guild, user, reason, elapsed=None):
+        logs_channel = discord.utils.get(guild.text_channels, name="logs-restrictions")
+        if not logs_channel:
+            overwrites = {
+                guild.default_role: discord.PermissionOverwrite(read_messages=False)
+            }
+            logs_channel = await guild.create_text_channel("logs-restrictions", overwrites=overwrites)
+
+        embed = discord.Embed(
+            title="User Restricted",
+            description=f"{user.mention} has been restricted.",
+            color=discord.Color.red()
+        )
+        embed.add_field(name="User ID", value=f"{user.id}", inline=False)
+        embed.add_field(name="Server", value=f"{guild.name}", inline=False)
+        embed.add_field(name="Server ID", value=f"{guild.id}", inline=False)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        if elapsed is not None:
+            embed.add_field(name="Restricted In", value=f"{elapsed:.0f} ms after detection", inline=False)
+        embed.set_footer(text=f"{user.name}", icon_url=user.avatar.url)
+        embed.timestamp = discord.utils.utcnow()
+
+        view = ActionView(user.id, guild.id, self)
+
+        await logs_channel.send(embed=embed, view=view)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Setup Function
+# ----------------------------------------------------------------------------------------------------------------------
+
+async def setup(bot):
+    async with db.transaction() as conn:
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS restricted_users (
+                user_id INTEGER,
+                guild_id INTEGER,
+                role_ids TEXT,
+                PRIMARY KEY (user_id, guild_id)
+            )
+        ''')
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS antispam_config (
+                guild_id INTEGER PRIMARY KEY,
+                spam_threshold INTEGER DEFAULT 5,
+                time_frame INTEGER DEFAULT 3
+            )
+        ''')
+
+    await bot.add_cog(AntiSpamCog(bot))
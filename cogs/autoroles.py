@@ -1,159 +1,234 @@
-import discord
-from discord.ext import commands
-from discord import app_commands
-import aiosqlite
-import os
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Database Configuration
-# ---------------------------------------------------------------------------------------------------------------------
-
-os.makedirs('./data/databases', exist_ok=True)
-db_path = './data/databases/serverfriend.db'
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Autorole Cog
-# ---------------------------------------------------------------------------------------------------------------------
-
-class AutoRoleCog(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-
-    # ---------------------------------------------------------------------------------------------------------------------
-    # Autorole Commands
-    # ---------------------------------------------------------------------------------------------------------------------
-
-    @app_commands.command(name="setup_autorole", description="Admin: Set up the autorole message.")
-    @app_commands.describe(channel="The channel where the autorole message will be sent")
-    @app_commands.checks.has_permissions(administrator=True)
-    async def setup_autorole(self, interaction: discord.Interaction, channel: discord.TextChannel):
-        await interaction.response.defer(ephemeral=True)
-
-        # Hardcoded message for autorole selection
-        message = (
-            "Welcome to our server! Once you've read the rules, choose the 'Member' role to see other channels. "
-            "Please select any other roles by reacting to this message: \n\n"
-            "✅ - Member \n"
-            "<:nephbox:1271580297024245771> - Nephbox\n"
-            "<:misu:1271580394583625728> - Misu\n"
-            "🖥️ - Gamer \n\n"
-            
-            "You can remove a role by removing your reaction. \n\n"
-            
-            "**roles determine which future annoucements you will recieve*"
-        )
-
-        # Send the autorole message
-        msg = await channel.send(message)
-
-        # Add reactions for roles
-        role_emojis = ['✅', '<:nephbox:1271580297024245771>', '<:misu:1271580394583625728>', '🖥️']
-        for emoji in role_emojis:
-            await msg.add_reaction(emoji)
-
-        async with aiosqlite.connect(db_path) as conn:
-            await conn.execute('''
-                CREATE TABLE IF NOT EXISTS autorole_message (
-                    guild_id INTEGER PRIMARY KEY,
-                    channel_id INTEGER NOT NULL,
-                    message_id INTEGER NOT NULL
-                )
-            ''')
-            await conn.execute('''
-                INSERT OR REPLACE INTO autorole_message (guild_id, channel_id, message_id)
-                VALUES (?, ?, ?)
-            ''', (interaction.guild.id, channel.id, msg.id))
-            await conn.commit()
-
-        await interaction.followup.send(f"Autorole message set up in {channel.mention}.", ephemeral=True)
-
-    # ---------------------------------------------------------------------------------------------------------------------
-    # Event Listeners
-    # ---------------------------------------------------------------------------------------------------------------------
-
-    @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        if payload.user_id == self.bot.user.id:
-            return
-
-        guild = self.bot.get_guild(payload.guild_id)
-        if not guild:
-            return
-
-        async with aiosqlite.connect(db_path) as conn:
-            cursor = await conn.execute('SELECT channel_id, message_id FROM autorole_message WHERE guild_id = ?',
-                                        (guild.id,))
-            result = await cursor.fetchone()
-
-        if result:
-            channel_id, message_id = result
-            if payload.message_id == message_id and payload.channel_id == channel_id:
-                member = guild.get_member(payload.user_id)
-                if not member:
-                    return
-
-                # Define your role emojis here
-                role_mapping = {
-                    '✅': 'Member',
-                    '<:nephbox:1271580297024245771>': 'Nephbox',
-                    '<:misu:1271580394583625728>': 'Misu',
-                    '🖥️': 'Gamer'
-                }
-
-                role_name = role_mapping.get(str(payload.emoji))
-                if role_name:
-                    role = discord.utils.get(guild.roles, name=role_name)
-                    if role:
-                        await member.add_roles(role)
-
-    # Function to remove roles when reaction is removed
-    @commands.Cog.listener()
-    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
-        if payload.user_id == self.bot.user.id:
-            return
-
-        guild = self.bot.get_guild(payload.guild_id)
-        if not guild:
-            return
-
-        async with aiosqlite.connect(db_path) as conn:
-            cursor = await conn.execute('SELECT channel_id, message_id FROM autorole_message WHERE guild_id = ?',
-                                        (guild.id,))
-            result = await cursor.fetchone()
-
-        if result:
-            channel_id, message_id = result
-            if payload.message_id == message_id and payload.channel_id == channel_id:
-                member = guild.get_member(payload.user_id)
-                if not member:
-                    return
-
-                # Define your role emojis here
-                role_mapping = {
-                    '✅': 'Member',
-                    '<:nephbox:1271580297024245771>': 'Nephbox',
-                    '<:misu:1271580394583625728>': 'Misu',
-                    '🖥️': 'Gamer'
-                }
-
-                role_name = role_mapping.get(str(payload.emoji))
-                if role_name:
-                    role = discord.utils.get(guild.roles, name=role_name)
-                    if role:
-                        await member.remove_roles(role)
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Setup Function
-# ---------------------------------------------------------------------------------------------------------------------
-
-async def setup(bot):
-    async with aiosqlite.connect(db_path) as conn:
-        await conn.execute('''
-            CREATE TABLE IF NOT EXISTS autorole_message (
-                guild_id INTEGER PRIMARY KEY,
-                channel_id INTEGER NOT NULL,
-                message_id INTEGER NOT NULL
-            )
-        ''')
-        await conn.commit()
-    await bot.add_cog(AutoRoleCog(bot))
+import discord
+from discord.ext import commands
+from discord import app_commands
+from core import db
+
+# Emoji to role name used to seed the mappings for the default autorole message
+DEFAULT_ROLE_MAPPING = {
+    '✅': 'Member',
+    '<:nephbox:1271580297024245771>': 'Nephbox',
+    '<:misu:1271580394583625728>': 'Misu',
+    '🖥️': 'Gamer'
+}
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Autorole Cog
+# ---------------------------------------------------------------------------------------------------------------------
+
+class AutoRoleCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.role_registry = {}  # (message_id, emoji) -> role_id
+        self.guild_messages = {}  # guild_id -> autorole message_id
+
+    async def cog_load(self):
+        rows = await db.fetchall('SELECT guild_id, message_id FROM autorole_message')
+        self.guild_messages = {guild_id: message_id for guild_id, message_id in rows}
+
+        rows = await db.fetchall('SELECT message_id, emoji, role_id FROM autorole_mapping')
+        self.role_registry = {(message_id, emoji): role_id for message_id, emoji, role_id in rows}
+        db.on_table_reset('autorole_mapping', self.forget_role_registry)
+        db.on_table_reset('autorole_message', self.forget_guild_messages)
+
+    def cog_unload(self):
+        db.remove_table_reset('autorole_mapping', self.forget_role_registry)
+        db.remove_table_reset('autorole_message', self.forget_guild_messages)
+
+    def forget_role_registry(self):
+        self.role_registry = {}
+
+    def forget_guild_messages(self):
+        self.guild_messages = {}
+
+    # ---------------------------------------------------------------------------------------------------------------------
+    # Registry Functions
+    # ---------------------------------------------------------------------------------------------------------------------
+
+    def resolve_default_roles(self, guild):
+        """Map each default emoji to the ID of the guild role with the matching name, skipping missing roles."""
+        mappings = {}
+        for emoji, role_name in DEFAULT_ROLE_MAPPING.items():
+            role = discord.utils.get(guild.roles, name=role_name)
+            if role:
+                mappings[emoji] = role.id
+        return mappings
+
+    async def set_autorole_message(self, guild_id, channel_id, message_id, mappings):
+        """Point the guild at a new autorole message and replace all of its emoji mappings."""
+        async with db.transaction() as conn:
+            await conn.execute('''
+                INSERT OR REPLACE INTO autorole_message (guild_id, channel_id, message_id)
+                VALUES (?, ?, ?)
+            ''', (guild_id, channel_id, message_id))
+            await conn.execute('DELETE FROM autorole_mapping WHERE guild_id = ?', (guild_id,))
+            await conn.executemany('''
+                INSERT INTO autorole_mapping (guild_id, message_id, emoji, role_id) VALUES (?, ?, ?, ?)
+            ''', [(guild_id, message_id, emoji, role_id) for emoji, role_id in mappings.items()])
+
+        old_message_id = self.guild_messages.get(guild_id)
+        if old_message_id is not None:
+            self.role_registry = {key: role_id for key, role_id in self.role_registry.items()
+                                  if key[0] != old_message_id}
+
+        self.guild_messages[guild_id] = message_id
+        for emoji, role_id in mappings.items():
+            self.role_registry[(message_id, emoji)] = role_id
+
+    async def add_mapping(self, guild_id, message_id, emoji, role_id):
+        await db.execute('''
+            INSERT INTO autorole_mapping (guild_id, message_id, emoji, role_id) VALUES (?, ?, ?, ?)
+            ON CONFLICT(message_id, emoji) DO UPDATE SET role_id = excluded.role_id
+        ''', (guild_id, message_id, emoji, role_id))
+        self.role_registry[(message_id, emoji)] = role_id
+
+    async def remove_mapping(self, message_id, emoji):
+        await db.execute('DELETE FROM autorole_mapping WHERE message_id = ? AND emoji = ?', (message_id, emoji))
+        return self.role_registry.pop((message_id, emoji), None)
+
+    # ---------------------------------------------------------------------------------------------------------------------
+    # Autorole Commands
+    # ---------------------------------------------------------------------------------------------------------------------
+
+    @app_commands.command(name="setup_autorole", description="Admin: Set up the autorole message.")
+    @app_commands.describe(channel="The channel where the autorole message will be sent")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def setup_autorole(self, interaction: discord.Interaction, channel: discord.TextChannel):
+        await interaction.response.defer(ephemeral=True)
+
+        # Hardcoded message for autorole selection
+        message = (
+            "Welcome to our server! Once you've read the rules, choose the 'Member' role to see other channels. "
+            "Please select any other roles by reacting to this message: \n\n"
+            "✅ - Member \n"
+            "<:nephbox:1271580297024245771> - Nephbox\n"
+            "<:misu:1271580394583625728> - Misu\n"
+            "🖥️ - Gamer \n\n"
+            
+            "You can remove a role by removing your reaction. \n\n"
+            
+            "**roles determine which future annoucements you will recieve*"
+        )
+
+        # Send the autorole message
+        msg = await channel.send(message)
+
+        # Add reactions for roles
+        for emoji in DEFAULT_ROLE_MAPPING:
+            await msg.add_reaction(emoji)
+
+        mappings = self.resolve_default_roles(interaction.guild)
+        await self.set_autorole_message(interaction.guild.id, channel.id, msg.id, mappings)
+
+        await interaction.followup.send(f"Autorole message set up in {channel.mention}.", ephemeral=True)
+
+    @app_commands.command(name="autorole_add", description="Admin: Map a reaction on the autorole message to a role.")
+    @app_commands.describe(emoji="The emoji members react with", role="The role to give")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def autorole_add(self, interaction: discord.Interaction, emoji: str, role: discord.Role):
+        message_id = self.guild_messages.get(interaction.guild.id)
+        if message_id is None:
+            await interaction.response.send_message("No autorole message is set up. Use `/setup_autorole` first.",
+                                                    ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        row = await db.fetchone('SELECT channel_id FROM autorole_message WHERE guild_id = ?', (interaction.guild.id,))
+        channel = interaction.guild.get_channel(row[0]) if row else None
+        if channel:
+            try:
+                await channel.get_partial_message(message_id).add_reaction(emoji)
+            except discord.HTTPException:
+                await interaction.followup.send(f"Could not react with {emoji}.", ephemeral=True)
+                return
+
+        await self.add_mapping(interaction.guild.id, message_id, emoji, role.id)
+        await interaction.followup.send(f"{emoji} now gives {role.mention}.", ephemeral=True)
+
+    @app_commands.command(name="autorole_remove", description="Admin: Remove a reaction role from the autorole message.")
+    @app_commands.describe(emoji="The emoji to stop handling")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def autorole_remove(self, interaction: discord.Interaction, emoji: str):
+        message_id = self.guild_messages.get(interaction.guild.id)
+        if message_id is None or await self.remove_mapping(message_id, emoji) is None:
+            await interaction.response.send_message(f"{emoji} is not mapped to a role.", ephemeral=True)
+            return
+
+        await interaction.response.send_message(f"{emoji} no longer gives a role.", ephemeral=True)
+
+    # ---------------------------------------------------------------------------------------------------------------------
+    # Event Listeners
+    # ---------------------------------------------------------------------------------------------------------------------
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Seed mappings for autorole messages created before the mapping table existed
+        for guild_id, message_id in self.guild_messages.items():
+            if any(key[0] == message_id for key in self.role_registry):
+                continue
+
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                continue
+
+            for emoji, role_id in self.resolve_default_roles(guild).items():
+                await self.add_mapping(guild_id, message_id, emoji, role_id)
+
+    def resolve_reaction(self, payload):
+        """Return the member and role for a reaction on an autorole message, or None for any other reaction."""
+        if payload.user_id == self.bot.user.id:
+            return None
+
+        role_id = self.role_registry.get((payload.message_id, str(payload.emoji)))
+        if role_id is None:
+            return None
+
+        guild = self.bot.get_guild(payload.guild_id)
+        if not guild:
+            return None
+
+        member = guild.get_member(payload.user_id)
+        role = guild.get_role(role_id)
+        if not member or not role:
+            return None
+
+        return member, role
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        resolved = self.resolve_reaction(payload)
+        if resolved:
+            member, role = resolved
+            await member.add_roles(role)
+
+    # Function to remove roles when reaction is removed
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        resolved = self.resolve_reaction(payload)
+        if resolved:
+            member, role = resolved
+            await member.remove_roles(role)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Setup Function
+# ---------------------------------------------------------------------------------------------------------------------
+
+async def setup(bot):
+    async with db.transaction() as conn:
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS autorole_message (
+                guild_id INTEGER PRIMARY KEY,
+                channel_id INTEGER NOT NULL,
+                message_id INTEGER NOT NULL
+            )
+        ''')
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS autorole_mapping (
+                guild_id INTEGER NOT NULL,
+                message_id INTEGER NOT NULL,
+                emoji TEXT NOT NULL,
+                role_id INTEGER NOT NULL,
+                PRIMARY KEY (message_id, emoji)
+            )
+        ''')
+    await bot.add_cog(AutoRoleCog(bot))
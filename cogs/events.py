@@ -1,352 +1,545 @@
-import discord
-import logging
-import aiohttp
-import aiosqlite
-import os
-from discord import app_commands
-from discord.ext import commands
-from PIL import Image, ImageDraw, ImageFont
-from io import BytesIO
-
-# Ensure the database directory exists
-os.makedirs('./data/databases', exist_ok=True)
-
-# Path to the SQLite database
-db_path = './data/databases/serverfriend.db'
-
-# Default Settings
-DEFAULT_WELCOME_MESSAGE = "Welcome to the server, {member}!"
-DEFAULT_TEXT_OVERLAY = "'{member}' has just joined the server"
-DEFAULT_BACKGROUND_COLOUR = "#EDDCFE"
-DEFAULT_BACKGROUND_IMAGE = None
-DEFAULT_AVATAR_RING_COLOUR = "#C891F9"
-DEFAULT_TEXT_COLOR = "#000000"
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Logging Configuration
-# ---------------------------------------------------------------------------------------------------------------------
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Event Class
-# ---------------------------------------------------------------------------------------------------------------------
-class EventCog(commands.Cog):
-
-    def __init__(self, bot):
-        self.bot = bot
-
-    async def create_welcome_image(self, member, guild_id):
-        # Fetch the avatar
-        avatar_url = str(member.avatar.url) if member.avatar else member.default_avatar.url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(avatar_url) as resp:
-                if resp.status != 200:
-                    return None
-                avatar_data = BytesIO(await resp.read())
-
-        # Fetch customization from the database
-        async with aiosqlite.connect(db_path) as conn:
-            async with conn.execute(
-                    'SELECT background_colour, background_image, avatar_ring_colour, text_overlay, text_color FROM event_config WHERE guild_id = ?',
-                    (guild_id,)) as cursor:
-                result = await cursor.fetchone()
-
-        if not result:
-            # Use default settings if no specific settings are found
-            background_colour = DEFAULT_BACKGROUND_COLOUR
-            background_image_url = DEFAULT_BACKGROUND_IMAGE
-            avatar_ring_colour = DEFAULT_AVATAR_RING_COLOUR
-            text_overlay = DEFAULT_TEXT_OVERLAY
-            text_color = '#000000'
-        else:
-            background_colour, background_image_url, avatar_ring_colour, text_overlay, text_color = result
-
-        default_background_size = (500, 250)
-        # Create the background
-        if background_image_url:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(background_image_url) as resp:
-                    if resp.status != 200:
-                        return None
-                    background_data = BytesIO(await resp.read())
-            background = Image.open(background_data).resize(default_background_size, Image.LANCZOS)
-        else:
-            background = Image.new('RGB', default_background_size, color=background_colour)
-
-        initial_size = 400
-        border_size = 20
-        final_size = 100
-
-        # Load and resize the avatar
-        avatar_image = Image.open(avatar_data).resize((initial_size, initial_size)).convert("RGBA")
-
-        # Create a circular mask for the avatar
-        mask = Image.new('L', (initial_size, initial_size), 0)
-        ImageDraw.Draw(mask).ellipse((0, 0, initial_size, initial_size), fill=255)
-        avatar_image.putalpha(mask)
-
-        # Create a larger image for the border
-        bordered_size = initial_size + border_size * 2
-        bordered_image = Image.new('RGBA', (bordered_size, bordered_size), avatar_ring_colour)
-        avatar_position = (border_size, border_size)
-        bordered_image.paste(avatar_image, avatar_position, avatar_image)
-
-        border_mask = Image.new('L', (bordered_size, bordered_size), 0)
-        ImageDraw.Draw(border_mask).ellipse((0, 0, bordered_size, bordered_size), fill=255)
-        bordered_image.putalpha(border_mask)
-
-        final_image = bordered_image.resize((final_size, final_size), Image.LANCZOS)
-
-        # Position the avatar in the center of the background
-        background_position = ((background.width - final_size) // 2, 50)
-        background.paste(final_image, background_position, final_image)
-
-        # Add the welcome text
-        draw = ImageDraw.Draw(background)
-        font_path = "data/welcome/Roboto-Regular.ttf"
-        font = ImageFont.truetype(font_path, 24)
-        formatted_text = text_overlay.replace("{member}", member.display_name)  # Replace the placeholder
-
-        text_bbox = draw.textbbox((0, 0), formatted_text, font=font)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_position = ((background.width - text_width) // 2, background_position[1] + final_size + 10)
-        draw.text(text_position, formatted_text, fill=text_color, font=font)  # Use the custom text color
-
-        # Save to a BytesIO object
-        final_buffer = BytesIO()
-        background.save(final_buffer, "PNG")
-        final_buffer.seek(0)
-
-        return final_buffer
-
-    # ---------------------------------------------------------------------------------------------------------------------
-    # Event Commands
-    # ---------------------------------------------------------------------------------------------------------------------
-    @app_commands.command(description="Set the Default Role and Channel for new members")
-    @commands.has_permissions(administrator=True)
-    async def welcome_set_defaults(self, interaction: discord.Interaction, channel: discord.TextChannel,
-                                   role: discord.Role = None):
-        guild_id = interaction.guild.id
-
-        async with aiosqlite.connect(db_path) as conn:
-            await conn.execute('''
-            INSERT INTO event_config (guild_id, default_role_id, default_channel_id) VALUES (?, ?, ?)
-            ON CONFLICT(guild_id) DO UPDATE SET default_role_id = excluded.default_role_id, default_channel_id = excluded.default_channel_id
-            ''', (guild_id, role.id if role else None, channel.id))
-            await conn.commit()
-
-        response_message = f"Success: Default Channel set: {channel.mention}."
-        if role:
-            response_message += f"\nDefault Role set: {role.name}."
-        else:
-            response_message += "\nNo default role set."
-
-        await interaction.response.send_message(f"`{response_message}`", ephemeral=True)
-
-    @app_commands.command(description="Set the Welcome Message for New Members")
-    @commands.has_permissions(administrator=True)
-    async def welcome_set_message(self, interaction: discord.Interaction, message: str):
-        guild_id = interaction.guild.id
-
-        async with aiosqlite.connect(db_path) as conn:
-            await conn.execute('''
-            INSERT INTO event_config (guild_id, welcome_message) VALUES (?, ?)
-            ON CONFLICT(guild_id) DO UPDATE SET welcome_message = excluded.welcome_message
-            ''', (guild_id, message))
-            await conn.commit()
-
-        await interaction.response.send_message(
-            f"`Success: Welcome message set to: '{message}'`", ephemeral=True)
-
-    @app_commands.command(description="Set the Background Colour for the Welcome Image")
-    @commands.has_permissions(administrator=True)
-    async def welcome_background_colour(self, interaction: discord.Interaction, colour: str):
-        guild_id = interaction.guild.id
-
-        async with aiosqlite.connect(db_path) as conn:
-            await conn.execute('''
-            INSERT INTO event_config (guild_id, background_colour) VALUES (?, ?)
-            ON CONFLICT(guild_id) DO UPDATE SET background_colour = excluded.background_colour
-            ''', (guild_id, colour))
-            await conn.commit()
-
-        await interaction.response.send_message(
-            f"`Success: Background colour set to: {colour}`", ephemeral=True)
-
-    @app_commands.command(description="Set the Background Image for the Welcome Image (500x250)")
-    @commands.has_permissions(administrator=True)
-    async def welcome_background_image(self, interaction: discord.Interaction, url: str):
-        guild_id = interaction.guild.id
-
-        async with aiosqlite.connect(db_path) as conn:
-            await conn.execute('''
-            INSERT INTO event_config (guild_id, background_image) VALUES (?, ?)
-            ON CONFLICT(guild_id) DO UPDATE SET background_image = excluded.background_image
-            ''', (guild_id, url))
-            await conn.commit()
-
-        await interaction.response.send_message(
-            f"`Success: Background image set to: {url}`", ephemeral=True)
-
-    @app_commands.command(description="Set the Ring Colour for the Welcome Image")
-    @commands.has_permissions(administrator=True)
-    async def welcome_avatar_ring_colour(self, interaction: discord.Interaction, colour: str):
-        guild_id = interaction.guild.id
-
-        async with aiosqlite.connect(db_path) as conn:
-            await conn.execute('''
-            INSERT INTO event_config (guild_id, avatar_ring_colour) VALUES (?, ?)
-            ON CONFLICT(guild_id) DO UPDATE SET avatar_ring_colour = excluded.avatar_ring_colour
-            ''', (guild_id, colour))
-            await conn.commit()
-
-        await interaction.response.send_message(
-            f"`Success: Avatar ring colour set to: {colour}`",
-            ephemeral=True)
-
-    @app_commands.command(description="Set the Text Overlay for the Welcome Image")
-    @commands.has_permissions(administrator=True)
-    async def welcome_text_overlay(self, interaction: discord.Interaction, text: str):
-        guild_id = interaction.guild.id
-        async with aiosqlite.connect(db_path) as conn:
-            await conn.execute('''
-            INSERT INTO event_config (guild_id, text_overlay) VALUES (?, ?)
-            ON CONFLICT(guild_id) DO UPDATE SET text_overlay = excluded.text_overlay
-            ''', (guild_id, text))
-            await conn.commit()
-
-        await interaction.response.send_message(
-            f"`Success: Text overlay set to: '{text}'`", ephemeral=True)
-
-    @app_commands.command(description="Set the Text Colour for the Welcome Image Overlay")
-    @commands.has_permissions(administrator=True)
-    async def welcome_text_color(self, interaction: discord.Interaction, color: str):
-        guild_id = interaction.guild.id
-        async with aiosqlite.connect(db_path) as conn:
-            await conn.execute('''
-            INSERT INTO event_config (guild_id, text_color) VALUES (?, ?)
-            ON CONFLICT(guild_id) DO UPDATE SET text_color = excluded.text_color
-            ''', (guild_id, color))
-            await conn.commit()
-
-        await interaction.response.send_message(f"`Success: Text color set to: {color}`", ephemeral=True)
-
-    @app_commands.command(description="Reset to default Welcome Message and Settings")
-    @commands.has_permissions(administrator=True)
-    async def welcome_reset(self, interaction: discord.Interaction):
-        guild_id = interaction.guild.id
-
-        async with aiosqlite.connect(db_path) as conn:
-            # Updating the command to reset all customizable fields including text_overlay and text_color
-            await conn.execute('''
-            UPDATE event_config SET
-                welcome_message = ?,
-                background_colour = ?,
-                background_image = ?,
-                avatar_ring_colour = ?,
-                text_overlay = ?,
-                text_color = ?  
-            WHERE guild_id = ?
-            ''', (
-                DEFAULT_WELCOME_MESSAGE,
-                DEFAULT_BACKGROUND_COLOUR,
-                DEFAULT_BACKGROUND_IMAGE,
-                DEFAULT_AVATAR_RING_COLOUR,
-                DEFAULT_TEXT_OVERLAY,
-                DEFAULT_TEXT_COLOR,
-                guild_id))
-            await conn.commit()
-
-        # Sending confirmation message to the interaction initiator
-        await interaction.response.send_message(
-            "`Success: All Welcome Event settings have been RESET to default values`", ephemeral=True)
-
-    # ---------------------------------------------------------------------------------------------------------------------
-    # Event Listeners
-    # ---------------------------------------------------------------------------------------------------------------------
-    @commands.Cog.listener()
-    async def on_member_join(self, member):
-        server = member.guild
-        if member.bot:
-            return  # Skip if the member is a bot
-
-        async with aiosqlite.connect(db_path) as conn:
-            async with conn.execute(
-                    'SELECT default_role_id, default_channel_id, welcome_message FROM event_config WHERE guild_id = ?',
-                    (server.id,)) as cursor:
-                config = await cursor.fetchone()
-
-        if not config:
-            logger.warning(f"No configuration found for server: {server.name}")
-            return
-
-        role_id, channel_id, welcome_message = config
-
-        # Try to add role if specified
-        if role_id:
-            role = server.get_role(role_id)
-            if role:
-                await member.add_roles(role)
-            else:
-                logger.warning(f"Could not find the default role: {role_id} in server: {server.name}")
-
-        # Try to find a suitable channel or use defaults
-        if channel_id:
-            channel = server.get_channel(channel_id)
-        else:
-            # Find a default channel if none specified
-            channel = discord.utils.find(lambda x: x.name in ['welcome', 'general'], server.text_channels)
-            if not channel:
-                channel = next((x for x in server.text_channels if x.permissions_for(server.me).send_messages), None)
-
-        if not channel:
-            logger.warning(f"Could not find a suitable channel to send the welcome message in server: {server.name}")
-            return
-
-        # Create and send welcome image
-        welcome_image_buffer = await self.create_welcome_image(member, server.id)  # Corrected function call
-        if welcome_image_buffer:
-            welcome_message_formatted = welcome_message.replace("{member}",
-                                                                member.mention) if welcome_message else f"Welcome to the server, {member.mention}!"
-            await channel.send(welcome_message_formatted, file=discord.File(welcome_image_buffer, "welcome_image.png"))
-
-    @commands.Cog.listener()
-    async def on_ready(self):
-        logger.info(f"{self.bot.user} has connected to Discord!")
-        for guild in self.bot.guilds:
-            async with aiosqlite.connect(db_path) as conn:
-                # Check if the guild is already configured
-                cursor = await conn.execute('SELECT 1 FROM event_config WHERE guild_id = ?', (guild.id,))
-                if not await cursor.fetchone():
-                    # Insert default configuration if not exists
-                    await conn.execute('''
-                        INSERT INTO event_config (guild_id, welcome_message, background_colour, background_image, avatar_ring_colour)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (guild.id, DEFAULT_WELCOME_MESSAGE, DEFAULT_BACKGROUND_COLOUR, DEFAULT_BACKGROUND_IMAGE, DEFAULT_AVATAR_RING_COLOUR))
-                    await conn.commit()
-                await cursor.close()
-        logger.info("Checked and updated database entries for all guilds.")
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Setup Function
-# ---------------------------------------------------------------------------------------------------------------------
-async def setup(bot):
-    os.makedirs('data/welcome', exist_ok=True)
-    async with aiosqlite.connect(db_path) as conn:
-        await conn.execute('''
-        CREATE TABLE IF NOT EXISTS event_config (
-            guild_id INTEGER PRIMARY KEY,
-            default_role_id INTEGER,
-            default_channel_id INTEGER,
-            welcome_message TEXT DEFAULT 'Welcome to the server, {member}!',
-            background_colour TEXT DEFAULT '#EDDCFE', 
-            background_image TEXT DEFAULT NULL,
-            avatar_ring_colour TEXT DEFAULT '#C891F9',
-            text_overlay TEXT DEFAULT "'{member}' has just joined the server",
-            text_color TEXT DEFAULT '#000000' 
-        )
-        ''')
-        await conn.commit()
+import asyncio
+import discord
+import itertools
+import logging
+import os
+import time
+from dataclasses import dataclass
+from discord import app_commands
+from discord.ext import commands
+from io import BytesIO
+from core import db
+from core.assets import WelcomeAssetCache
+from core.ratelimit import RateLimiter
+from core.welcome import (COLLAGE_MAX_AVATARS, DEFAULT_IMAGE_FORMAT, DEFAULT_IMAGE_QUALITY, IMAGE_FORMATS,
+                          WelcomeCollageSpec, WelcomeRenderSpec, WelcomeTemplate, render_join_collage, render_pool)
+
+# Default Settings
+DEFAULT_WELCOME_MESSAGE = "Welcome to the server, {member}!"
+DEFAULT_TEXT_OVERLAY = "'{member}' has just joined the server"
+DEFAULT_BACKGROUND_COLOUR = "#EDDCFE"
+DEFAULT_BACKGROUND_IMAGE = None
+DEFAULT_AVATAR_RING_COLOUR = "#C891F9"
+DEFAULT_TEXT_COLOR = "#000000"
+
+# Seconds a compiled welcome template is reused before it is rebuilt, picking up any revalidated background
+TEMPLATE_TTL = 600
+
+# Joins are counted over this many seconds to decide whether a guild is in a join burst
+JOIN_RATE_WINDOW = 10
+
+# Most members mentioned by name in one batched welcome message
+BATCH_MAX_MENTIONS = 50
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Join Burst Config
+# ---------------------------------------------------------------------------------------------------------------------
+# Once a guild sees more than `join_threshold` joins inside JOIN_RATE_WINDOW, joins are collected for `batch_window`
+# seconds and welcomed with one message, either a mention list or an avatar collage. Batching stops at the end of a
+# window once the join rate is back under the threshold.
+
+
+@dataclass(frozen=True)
+class BurstConfig:
+    join_threshold: int = 5
+    batch_window: int = 10
+    burst_mode: str = 'list'
+
+
+DEFAULT_BURST_CONFIG = BurstConfig()
+
+BURST_MODES = ('list', 'collage')
+MAX_JOIN_THRESHOLD = 100
+MAX_BATCH_WINDOW = 120
+
+
+class JoinBurst:
+
+    def __init__(self, channel, welcome_message):
+        self.channel = channel
+        self.welcome_message = welcome_message
+        self.members = []
+        self.task = None
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Event Class
+# ---------------------------------------------------------------------------------------------------------------------
+class EventCog(commands.Cog):
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.render_pool = render_pool
+        self.assets = WelcomeAssetCache(self.render_pool)
+        self.templates = {}  # guild_id -> (built_at, WelcomeTemplate)
+        self.template_versions = itertools.count()
+        self.burst_configs = {}  # guild_id -> BurstConfig, kept in sync by /welcome_burst_settings
+        self.join_rate = RateLimiter(window=JOIN_RATE_WINDOW)
+        self.join_bursts = {}  # guild_id -> JoinBurst while the guild is batching joins
+
+    async def cog_load(self):
+        self.render_pool.start()
+        await self.assets.start()
+        rows = await db.fetchall('SELECT guild_id, join_threshold, batch_window, burst_mode FROM welcome_burst_config')
+        self.burst_configs = {guild_id: BurstConfig(*settings) for guild_id, *settings in rows}
+        db.on_table_reset('event_config', self.templates.clear)
+        db.on_table_reset('welcome_output_config', self.templates.clear)
+        db.on_table_reset('welcome_burst_config', self.forget_burst_configs)
+
+    async def cog_unload(self):
+        for burst in self.join_bursts.values():
+            burst.task.cancel()
+        db.remove_table_reset('event_config', self.templates.clear)
+        db.remove_table_reset('welcome_output_config', self.templates.clear)
+        db.remove_table_reset('welcome_burst_config', self.forget_burst_configs)
+
+    def forget_burst_configs(self):
+        self.burst_configs = {}
+
+    def get_burst_config(self, guild_id):
+        return self.burst_configs.get(guild_id, DEFAULT_BURST_CONFIG)
+
+    async def build_template(self, guild_id):
+        # Fetch customization from the database
+        result = await db.fetchone(
+            'SELECT background_colour, background_image, avatar_ring_colour, text_overlay, text_color FROM event_config WHERE guild_id = ?',
+            (guild_id,))
+
+        if not result:
+            # Use default settings if no specific settings are found
+            background_colour = DEFAULT_BACKGROUND_COLOUR
+            background_image_url = DEFAULT_BACKGROUND_IMAGE
+            avatar_ring_colour = DEFAULT_AVATAR_RING_COLOUR
+            text_overlay = DEFAULT_TEXT_OVERLAY
+            text_color = '#000000'
+        else:
+            background_colour, background_image_url, avatar_ring_colour, text_overlay, text_color = result
+
+        # Fetch the background image, if one is set, already decoded and resized
+        background_data, background_mode = None, 'RGB'
+        if background_image_url:
+            background = await self.assets.get_background(guild_id, background_image_url)
+            if background is None:
+                return None
+            background_mode, background_data = background
+
+        output = await db.fetchone('SELECT image_format, image_quality FROM welcome_output_config WHERE guild_id = ?',
+                                   (guild_id,))
+        image_format, image_quality = output or (DEFAULT_IMAGE_FORMAT, DEFAULT_IMAGE_QUALITY)
+
+        return WelcomeTemplate(
+            key=(guild_id, next(self.template_versions)),
+            text_overlay=text_overlay,
+            text_color=text_color,
+            avatar_ring_colour=avatar_ring_colour,
+            background_colour=background_colour,
+            background=background_data,
+            background_mode=background_mode,
+            image_format=image_format,
+            image_quality=image_quality
+        )
+
+    async def get_template(self, guild_id):
+        cached = self.templates.get(guild_id)
+        if cached is not None and time.monotonic() - cached[0] < TEMPLATE_TTL:
+            return cached[1]
+
+        template = await self.build_template(guild_id)
+        if template is not None:
+            self.templates[guild_id] = (time.monotonic(), template)
+        return template
+
+    def invalidate_template(self, guild_id):
+        self.templates.pop(guild_id, None)
+
+    async def build_render_spec(self, member, guild_id):
+        # Fetch the avatar, from the asset cache when this avatar has been seen before
+        avatar_data = await self.assets.get_avatar(member)
+        if avatar_data is None:
+            return None
+
+        template = await self.get_template(guild_id)
+        if template is None:
+            return None
+
+        return WelcomeRenderSpec(template=template, avatar=avatar_data, display_name=member.display_name)
+
+    async def create_welcome_image(self, member, guild_id):
+        # Any failure falls back to a text-only welcome; None means an asset was missing or the render queue was full
+        try:
+            spec = await self.build_render_spec(member, guild_id)
+            if spec is None:
+                return None
+            image = await self.render_pool.render((guild_id, member.id), spec)
+        except Exception as e:
+            logger.error(f"Failed to render the welcome image for {member.name} ({member.id}) in guild {guild_id}: {e}")
+            return None
+        if not image:
+            return None
+        return discord.File(BytesIO(image), f"welcome_image.{IMAGE_FORMATS[spec.template.image_format]}")
+
+    async def create_join_collage(self, members, guild_id):
+        try:
+            template = await self.get_template(guild_id)
+            if template is None:
+                return None
+
+            # A member whose avatar could not be loaded is left out of the grid, not the whole batch
+            fetches = (self.assets.get_avatar(member) for member in members[:COLLAGE_MAX_AVATARS])
+            avatars = await asyncio.gather(*fetches, return_exceptions=True)
+            spec = WelcomeCollageSpec(template=template,
+                                      avatars=tuple(avatar for avatar in avatars if isinstance(avatar, bytes)),
+                                      member_count=len(members))
+            image = await self.render_pool.render((guild_id, 'collage'), spec, render_join_collage)
+        except Exception as e:
+            logger.error(f"Failed to render the join collage in guild {guild_id}: {e}")
+            return None
+        if not image:
+            return None
+        return discord.File(BytesIO(image), f"welcome_collage.{IMAGE_FORMATS[template.image_format]}")
+
+    # ---------------------------------------------------------------------------------------------------------------------
+    # Join Bursts
+    # ---------------------------------------------------------------------------------------------------------------------
+    def queue_burst_join(self, member, channel, welcome_message, config):
+        guild_id = member.guild.id
+        burst = self.join_bursts.get(guild_id)
+        if burst is None:
+            logger.info(f"Join burst in guild {member.guild.name}; batching welcomes every {config.batch_window}s")
+            burst = self.join_bursts[guild_id] = JoinBurst(channel, welcome_message)
+            burst.task = asyncio.create_task(self.flush_join_burst(guild_id, config))
+        burst.members.append(member)
+
+    async def flush_join_burst(self, guild_id, config):
+        burst = self.join_bursts[guild_id]
+        try:
+            while True:
+                await asyncio.sleep(config.batch_window)
+                members, burst.members = burst.members, []
+                if members:
+                    # One failed batch must not end batching mid-burst; the next batch is tried as usual
+                    try:
+                        await self.send_join_batch(burst, members, guild_id, config)
+                    except Exception as e:
+                        logger.error(f"Failed to send a batched welcome for {len(members)} members in guild "
+                                     f"{guild_id}: {e}")
+
+                # Leave batching mode only when nothing arrived while sending and the rate has dropped
+                if not burst.members and self.join_rate.count(guild_id) <= config.join_threshold:
+                    logger.info(f"Join burst in guild {guild_id} has ended")
+                    return
+        finally:
+            if self.join_bursts.get(guild_id) is burst:
+                del self.join_bursts[guild_id]
+
+    async def send_join_batch(self, burst, members, guild_id, config):
+        mentions = ", ".join(member.mention for member in members[:BATCH_MAX_MENTIONS])
+        if len(members) > BATCH_MAX_MENTIONS:
+            mentions += f" and {len(members) - BATCH_MAX_MENTIONS} others"
+        message = burst.welcome_message.replace("{member}", mentions) if burst.welcome_message \
+            else f"Welcome to the server, {mentions}!"
+
+        collage = None
+        if config.burst_mode == 'collage':
+            collage = await self.create_join_collage(members, guild_id)
+        if collage:
+            try:
+                await burst.channel.send(message, file=collage)
+                return
+            except discord.HTTPException as e:
+                # Usually the upload itself; the members still get the text-only welcome
+                logger.error(f"Failed to send the join collage in guild {guild_id}: {e}")
+        await burst.channel.send(message)
+
+    # ---------------------------------------------------------------------------------------------------------------------
+    # Event Commands
+    # ---------------------------------------------------------------------------------------------------------------------
+    @app_commands.command(description="Set the Default Role and Channel for new members")
+    @commands.has_permissions(administrator=True)
+    async def welcome_set_defaults(self, interaction: discord.Interaction, channel: discord.TextChannel,
+                                   role: discord.Role = None):
+        guild_id = interaction.guild.id
+
+        await db.execute('''
+        INSERT INTO event_config (guild_id, default_role_id, default_channel_id) VALUES (?, ?, ?)
+        ON CONFLICT(guild_id) DO UPDATE SET default_role_id = excluded.default_role_id, default_channel_id = excluded.default_channel_id
+        ''', (guild_id, role.id if role else None, channel.id))
+        self.invalidate_template(guild_id)
+
+        response_message = f"Success: Default Channel set: {channel.mention}."
+        if role:
+            response_message += f"\nDefault Role set: {role.name}."
+        else:
+            response_message += "\nNo default role set."
+
+        await interaction.response.send_message(f"`{response_message}`", ephemeral=True)
+
+    @app_commands.command(description="Set the Welcome Message for New Members")
+    @commands.has_permissions(administrator=True)
+    async def welcome_set_message(self, interaction: discord.Interaction, message: str):
+        guild_id = interaction.guild.id
+
+        await db.execute('''
+        INSERT INTO event_config (guild_id, welcome_message) VALUES (?, ?)
+        ON CONFLICT(guild_id) DO UPDATE SET welcome_message = excluded.welcome_message
+        ''', (guild_id, message))
+        self.invalidate_template(guild_id)
+
+        await interaction.response.send_message(
+            f"`Success: Welcome message set to: '{message}'`", ephemeral=True)
+
+    @app_commands.command(description="Set the Background Colour for the Welcome Image")
+    @commands.has_permissions(administrator=True)
+    async def welcome_background_colour(self, interaction: discord.Interaction, colour: str):
+        guild_id = interaction.guild.id
+
+        await db.execute('''
+        INSERT INTO event_config (guild_id, background_colour) VALUES (?, ?)
+        ON CONFLICT(guild_id) DO UPDATE SET background_colour = excluded.background_colour
+        ''', (guild_id, colour))
+        self.invalidate_template(guild_id)
+
+        await interaction.response.send_message(
+            f"`Success: Background colour set to: {colour}`", ephemeral=True)
+
+    @app_commands.command(description="Set the Background Image for the Welcome Image (500x250)")
+    @commands.has_permissions(administrator=True)
+    async def welcome_background_image(self, interaction: discord.Interaction, url: str):
+        guild_id = interaction.guild.id
+
+        await db.execute('''
+        INSERT INTO event_config (guild_id, background_image) VALUES (?, ?)
+        ON CONFLICT(guild_id) DO UPDATE SET background_image = excluded.background_image
+        ''', (guild_id, url))
+        self.invalidate_template(guild_id)
+        await self.assets.invalidate_background(guild_id)
+
+        await interaction.response.send_message(
+            f"`Success: Background image set to: {url}`", ephemeral=True)
+
+    @app_commands.command(description="Set the Ring Colour for the Welcome Image")
+    @commands.has_permissions(administrator=True)
+    async def welcome_avatar_ring_colour(self, interaction: discord.Interaction, colour: str):
+        guild_id = interaction.guild.id
+
+        await db.execute('''
+        INSERT INTO event_config (guild_id, avatar_ring_colour) VALUES (?, ?)
+        ON CONFLICT(guild_id) DO UPDATE SET avatar_ring_colour = excluded.avatar_ring_colour
+        ''', (guild_id, colour))
+        self.invalidate_template(guild_id)
+
+        await interaction.response.send_message(
+            f"`Success: Avatar ring colour set to: {colour}`",
+            ephemeral=True)
+
+    @app_commands.command(description="Set the Text Overlay for the Welcome Image")
+    @commands.has_permissions(administrator=True)
+    async def welcome_text_overlay(self, interaction: discord.Interaction, text: str):
+        guild_id = interaction.guild.id
+        await db.execute('''
+        INSERT INTO event_config (guild_id, text_overlay) VALUES (?, ?)
+        ON CONFLICT(guild_id) DO UPDATE SET text_overlay = excluded.text_overlay
+        ''', (guild_id, text))
+        self.invalidate_template(guild_id)
+
+        await interaction.response.send_message(
+            f"`Success: Text overlay set to: '{text}'`", ephemeral=True)
+
+    @app_commands.command(description="Set the Text Colour for the Welcome Image Overlay")
+    @commands.has_permissions(administrator=True)
+    async def welcome_text_color(self, interaction: discord.Interaction, color: str):
+        guild_id = interaction.guild.id
+        await db.execute('''
+        INSERT INTO event_config (guild_id, text_color) VALUES (?, ?)
+        ON CONFLICT(guild_id) DO UPDATE SET text_color = excluded.text_color
+        ''', (guild_id, color))
+        self.invalidate_template(guild_id)
+
+        await interaction.response.send_message(f"`Success: Text color set to: {color}`", ephemeral=True)
+
+    @app_commands.command(description="Set the File Format and Quality of the Welcome Image")
+    @app_commands.describe(image_format="webp is the smallest; png_optimized is slow to encode on photo backgrounds",
+                           quality="WebP quality, or the share of colours kept by png_quantized")
+    @app_commands.choices(image_format=[app_commands.Choice(name=name, value=name) for name in IMAGE_FORMATS])
+    @app_commands.checks.has_permissions(administrator=True)
+    async def welcome_image_format(self, interaction: discord.Interaction, image_format: app_commands.Choice[str],
+                                   quality: app_commands.Range[int, 1, 100] = DEFAULT_IMAGE_QUALITY):
+        guild_id = interaction.guild.id
+        await db.execute('''
+        INSERT INTO welcome_output_config (guild_id, image_format, image_quality) VALUES (?, ?, ?)
+        ON CONFLICT(guild_id) DO UPDATE SET image_format = excluded.image_format, image_quality = excluded.image_quality
+        ''', (guild_id, image_format.value, quality))
+        self.invalidate_template(guild_id)
+
+        await interaction.response.send_message(
+            f"`Success: Welcome images will be sent as {image_format.value} (quality {quality}). "
+            f"Average size so far: {self.render_pool.average_size() / 1024:.1f} KiB`", ephemeral=True)
+
+    @app_commands.command(description="Reset to default Welcome Message and Settings")
+    @commands.has_permissions(administrator=True)
+    async def welcome_reset(self, interaction: discord.Interaction):
+        guild_id = interaction.guild.id
+
+        # Updating the command to reset all customizable fields including text_overlay and text_color
+        await db.execute('''
+        UPDATE event_config SET
+            welcome_message = ?,
+            background_colour = ?,
+            background_image = ?,
+            avatar_ring_colour = ?,
+            text_overlay = ?,
+            text_color = ?  
+        WHERE guild_id = ?
+        ''', (
+            DEFAULT_WELCOME_MESSAGE,
+            DEFAULT_BACKGROUND_COLOUR,
+            DEFAULT_BACKGROUND_IMAGE,
+            DEFAULT_AVATAR_RING_COLOUR,
+            DEFAULT_TEXT_OVERLAY,
+            DEFAULT_TEXT_COLOR,
+            guild_id))
+        await db.execute('DELETE FROM welcome_output_config WHERE guild_id = ?', (guild_id,))
+        self.invalidate_template(guild_id)
+        await self.assets.invalidate_background(guild_id)
+
+        # Sending confirmation message to the interaction initiator
+        await interaction.response.send_message(
+            "`Success: All Welcome Event settings have been RESET to default values`", ephemeral=True)
+
+    @app_commands.command(description="View or change how welcomes are batched during join bursts")
+    @app_commands.describe(join_threshold=f"Joins within {JOIN_RATE_WINDOW}s before welcomes are batched",
+                           batch_window="Seconds of joins collected into each batched welcome",
+                           burst_mode="Send each batch as a mention list or an avatar collage")
+    @app_commands.choices(burst_mode=[app_commands.Choice(name=mode, value=mode) for mode in BURST_MODES])
+    @app_commands.checks.has_permissions(administrator=True)
+    async def welcome_burst_settings(self, interaction: discord.Interaction,
+                                     join_threshold: app_commands.Range[int, 1, MAX_JOIN_THRESHOLD] = None,
+                                     batch_window: app_commands.Range[int, 1, MAX_BATCH_WINDOW] = None,
+                                     burst_mode: app_commands.Choice[str] = None):
+        guild_id = interaction.guild.id
+        config = self.get_burst_config(guild_id)
+
+        if join_threshold is not None or batch_window is not None or burst_mode is not None:
+            config = BurstConfig(join_threshold or config.join_threshold, batch_window or config.batch_window,
+                                 burst_mode.value if burst_mode else config.burst_mode)
+            await db.execute('''
+            INSERT INTO welcome_burst_config (guild_id, join_threshold, batch_window, burst_mode) VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id) DO UPDATE SET join_threshold = excluded.join_threshold,
+                batch_window = excluded.batch_window, burst_mode = excluded.burst_mode
+            ''', (guild_id, config.join_threshold, config.batch_window, config.burst_mode))
+            self.burst_configs[guild_id] = config
+
+        status = "batching joins now" if guild_id in self.join_bursts else "not in a join burst"
+        await interaction.response.send_message(
+            f"`Batch welcomes past {config.join_threshold} joins in {JOIN_RATE_WINDOW}s, "
+            f"every {config.batch_window}s as a {config.burst_mode} ({status})`", ephemeral=True)
+
+    # ---------------------------------------------------------------------------------------------------------------------
+    # Event Listeners
+    # ---------------------------------------------------------------------------------------------------------------------
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        server = member.guild
+        if member.bot:
+            return  # Skip if the member is a bot
+
+        config = await db.fetchone(
+            'SELECT default_role_id, default_channel_id, welcome_message FROM event_config WHERE guild_id = ?',
+            (server.id,))
+
+        if not config:
+            logger.warning(f"No configuration found for server: {server.name}")
+            return
+
+        role_id, channel_id, welcome_message = config
+
+        # Try to add role if specified
+        if role_id:
+            role = server.get_role(role_id)
+            if role:
+                await member.add_roles(role)
+            else:
+                logger.warning(f"Could not find the default role: {role_id} in server: {server.name}")
+
+        # Try to find a suitable channel or use defaults
+        if channel_id:
+            channel = server.get_channel(channel_id)
+        else:
+            # Find a default channel if none specified
+            channel = discord.utils.find(lambda x: x.name in ['welcome', 'general'], server.text_channels)
+            if not channel:
+                channel = next((x for x in server.text_channels if x.permissions_for(server.me).send_messages), None)
+
+        if not channel:
+            logger.warning(f"Could not find a suitable channel to send the welcome message in server: {server.name}")
+            return
+
+        # During a join burst, welcome members in batches instead of rendering an image for each one
+        burst_config = self.get_burst_config(server.id)
+        join_count = self.join_rate.hit(server.id)
+        if server.id in self.join_bursts or join_count > burst_config.join_threshold:
+            self.queue_burst_join(member, channel, welcome_message, burst_config)
+            return
+
+        # Create and send welcome image
+        welcome_image = await self.create_welcome_image(member, server.id)  # Corrected function call
+        welcome_message_formatted = welcome_message.replace("{member}",
+                                                            member.mention) if welcome_message else f"Welcome to the server, {member.mention}!"
+        if welcome_image:
+            await channel.send(welcome_message_formatted, file=welcome_image)
+        else:
+            # Render was dropped under load or an image could not be fetched; still greet the member
+            await channel.send(welcome_message_formatted)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        logger.info(f"{self.bot.user} has connected to Discord!")
+        # Insert default configuration for any guild that is not configured yet
+        await db.executemany('''
+            INSERT INTO event_config (guild_id, welcome_message, background_colour, background_image, avatar_ring_colour)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(guild_id) DO NOTHING
+        ''', [(guild.id, DEFAULT_WELCOME_MESSAGE, DEFAULT_BACKGROUND_COLOUR, DEFAULT_BACKGROUND_IMAGE,
+               DEFAULT_AVATAR_RING_COLOUR) for guild in self.bot.guilds])
+        logger.info("Checked and updated database entries for all guilds.")
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Setup Function
+# ---------------------------------------------------------------------------------------------------------------------
+async def setup(bot):
+    os.makedirs('data/welcome', exist_ok=True)
+    await db.execute('''
+    CREATE TABLE IF NOT EXISTS event_config (
+        guild_id INTEGER PRIMARY KEY,
+        default_role_id INTEGER,
+        default_channel_id INTEGER,
+        welcome_message TEXT DEFAULT 'Welcome to the server, {member}!',
+        background_colour TEXT DEFAULT '#EDDCFE', 
+        background_image TEXT DEFAULT NULL,
+        avatar_ring_colour TEXT DEFAULT '#C891F9',
+        text_overlay TEXT DEFAULT "'{member}' has just joined the server",
+        text_color TEXT DEFAULT '#000000' 
+    )
+    ''')
+    await db.execute('''
+    CREATE TABLE IF NOT EXISTS welcome_burst_config (
+        guild_id INTEGER PRIMARY KEY,
+        join_threshold INTEGER DEFAULT 5,
+        batch_window INTEGER DEFAULT 10,
+        burst_mode TEXT DEFAULT 'list'
+    )
+    ''')
+    await db.execute('''
+    CREATE TABLE IF NOT EXISTS welcome_output_config (
+        guild_id INTEGER PRIMARY KEY,
+        image_format TEXT DEFAULT 'png',
+        image_quality INTEGER DEFAULT 80
+    )
+    ''')
     await bot.add_cog(EventCog(bot))
\ No newline at end of file
@@ -1,282 +1,504 @@
-import discord
-import datetime
-import logging
-import socket
-import asyncio
-import os
-import aiosqlite
-
-from discord import app_commands
-from discord.ext import commands, tasks
-from mcstatus import JavaServer
-
-from cogs.customisation import get_embed_colour
-from core.utils import log_command_usage
-
-# ---------------------------------------------------------------------------------------------------------------------
-# DATABASE INITIALISATION
-# ---------------------------------------------------------------------------------------------------------------------
-
-# Ensure the database directory exists
-os.makedirs('./data/databases', exist_ok=True)
-
-# Connect to SQLite database asynchronously
-db_path = './data/databases/serverfriend.db'
-
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Logging Configuration
-# ---------------------------------------------------------------------------------------------------------------------
-
-logging.basicConfig(level=logging.WARNING)
-logger = logging.getLogger(__name__)
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Utility Functions (Updated for Async)
-# ---------------------------------------------------------------------------------------------------------------------
-
-
-async def async_socket_connect(ip, port, timeout=5):
-    try:
-        conn = asyncio.open_connection(ip, port)
-        _, writer = await asyncio.wait_for(conn, timeout=timeout)
-        writer.close()
-        await writer.wait_closed()
-    except asyncio.TimeoutError:
-        logging.error(f"Timeout Error in async_socket_connect: Connection to {ip}:{port} timed out")
-    except Exception as e:
-        logging.error(f"Error in async_socket_connect: {e}")
-
-def send_steam_query(ip: str, port: int, timeout: float = 5.0) -> str:
-    try:
-        message = b'\xFF\xFF\xFF\xFFTSource Engine Query\x00'
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-            sock.settimeout(timeout)
-            sock.sendto(message, (ip, port))
-            try:
-                data, _ = sock.recvfrom(4096)
-                return ":green_circle:"  # Server responded
-            except socket.timeout:
-                return ":red_circle:"  # No response
-    except Exception as e:
-        logging.error(f"Error in send_steam_query: {e}")
-        return ":red_circle:"
-
-def ping_udp_server(ip: str, port: int, timeout: float = 5.0) -> str:
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-            sock.settimeout(timeout)
-            message = b"Test packet"
-            sock.sendto(message, (ip, port))
-            try:
-                data, _ = sock.recvfrom(1024)
-                return ":green_circle:"  # Server responded
-            except socket.timeout:
-                return ":red_circle:"  # No response
-    except Exception as e:
-        logging.error(f"Error in ping_udp_server: {e}")
-        return ":red_circle:"
-
-def check_tcp_server_status(ip: str, port: int, timeout: float = 5.0) -> str:
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.settimeout(timeout)
-            sock.connect((ip, port))
-            return ":green_circle:"  # Server is UP
-    except Exception as e:
-        logging.error(f"Error in check_tcp_server_status: {e}")
-        return ":red_circle:"  # Server is DOWN
-
-async def check_server_status(server_type, ip, port=None):
-    try:
-        if server_type == "minecraft":
-            server = JavaServer.lookup(ip)
-            server.status()
-            return ":green_circle:"
-        elif server_type == "valheim":
-            return await asyncio.get_event_loop().run_in_executor(None, send_steam_query, ip, port + 1)
-        elif server_type == "zomboid":
-            return await asyncio.get_event_loop().run_in_executor(None, send_steam_query, ip, port)
-        elif server_type == "palworld":
-            return await asyncio.get_event_loop().run_in_executor(None, ping_udp_server, ip, port)
-        elif server_type == "scp":
-            return await asyncio.get_event_loop().run_in_executor(None, check_tcp_server_status, ip, port)
-        elif server_type=="enshrouded":
-            return await asyncio.get_event_loop().run_in_executor(None, send_steam_query, ip, port)
-        elif server_type=="vrising":
-            return await asyncio.get_event_loop().run_in_executor(None, send_steam_query, ip, port)
-
-
-    except asyncio.TimeoutError:
-        return ":red_circle:"
-    except Exception as e:
-        return ":red_circle:"
-
-# ---------------------------------------------------------------------------------------------------------------------
-# ServerUpdatesCog Class
-# ---------------------------------------------------------------------------------------------------------------------
-class ServerUpdatesCog(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.channel_id = None
-        self.message_id = None
-
-    @commands.Cog.listener()
-    async def on_ready(self):
-        await self.cog_load()
-        self.update_status.start()
-        logger.error(f"Game Servers - Message Task: Started")
-
-    async def cog_load(self):
-        async with aiosqlite.connect(db_path) as conn:
-            async with conn.execute('SELECT channel_id, message_id FROM server_status WHERE id = 1') as cursor:
-                data = await cursor.fetchone()
-                if data:
-                    self.channel_id, self.message_id = data
-
-    def cog_unload(self):
-        self.update_status.cancel()
-
-    @tasks.loop(minutes=1)
-    async def update_status(self):
-
-        try:
-            if not (self.channel_id and self.message_id):
-                return
-
-            channel = self.bot.get_channel(self.channel_id)
-            if not channel:
-                logging.error("Channel not found!")
-                return
-
-            message = await channel.fetch_message(self.message_id)
-            if not message:
-                logging.error("Message not found!")
-                return
-
-            embed = await self.construct_embed()
-            await message.edit(embed=embed)
-
-        except Exception as e:
-            logging.error(f"Unhandled exception in update_status: {e}")
-
-
-    @update_status.before_loop
-    async def before_update_status(self):
-        await self.bot.wait_until_ready()
-
-    async def construct_embed(self):
-        date_raw = datetime.datetime.utcnow()
-        date = date_raw.strftime(f"%d/%m/%Y")
-        time = date_raw.strftime("%H:%M")
-
-        async with aiosqlite.connect(db_path) as conn:
-            embed = discord.Embed(title="GAME SERVER LIST",
-                                  description="Passwords: `᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼`",
-                                  color=await get_embed_colour(conn))
-
-        # Server check tasks
-        server_check_tasks = [
-            check_server_status("minecraft", "mc.nephbox.net"),  # results[0]
-            check_server_status("minecraft", "dawncraft.nephbox.net"),  # results[1]
-            check_server_status("minecraft", "pixelmon.nephbox.net"),  # results[2]
-            check_server_status("minecraft", "allthemods.nephbox.net"),  # results[3]
-            check_server_status("minecraft", "deceased.nephbox.net"),  # results[4]
-            check_server_status("minecraft", "prominence.nephbox.net"),  # results[5]
-            check_server_status("valheim", "192.168.0.40", 2456),  # results[6]
-            check_server_status("palworld", "192.168.0.40", 8766),  # results[7]
-            check_server_status("zomboid", "192.168.0.40", 19132),  # results[8]
-            check_server_status("enshrouded", "82.14.1.253", 15637),  # results[9]
-            check_server_status("vrising", "82.14.1.253", 9877),  # results[10]
-        ]
-
-        results = await asyncio.gather(*server_check_tasks)
-
-        # Minecraft server statuses
-        embed.add_field(name="Minecraft", value=(
-            f"┕ {results[0]} Vanilla(ish):‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎  ‎`mc.nephbox.net`     \n"
-            f"┕ {results[1]} Dawncraft :‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎ `dawncraft.nephbox.net` \n"
-            f"┕ {results[2]} Pixelmon:‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎`pixelmon.nephbox.net`  \n"
-            f"┕ {results[3]} All the Mods:‎ ‎ ‎ ‎ ‎ `allthemods.nephbox.net` \n"
-            f"┕ {results[4]} Deceased: ‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎ `deceased.nephbox.net`   \n"
-            f"┕ {results[5]} Prominence: ‎ ‎ ‎ ‎ ‎ `prominence.nephbox.net` "
-        ), inline=False)
-
-        # Modpacks with links
-        modpacks = {
-            "Dawncraft": "https://www.curseforge.com/minecraft/modpacks/dawn-craft",
-            "Pixelmon": "https://www.curseforge.com/minecraft/modpacks/the-pixelmon-modpack",
-            "All the Mods": "https://www.curseforge.com/minecraft/modpacks/all-the-mods-9",
-            "Deceased": "https://www.curseforge.com/minecraft/modpacks/deceasedcraft",
-            "Prominence": "https://www.curseforge.com/minecraft/modpacks/prominence-2-rpg"
-        }
-        embed.add_field(name="Modpacks", value="\n".join([f"[{name}]({url})" for name, url in modpacks.items()]),
-                        inline=True)
-
-        # Wikis (if needed)
-        wikis = {
-            "Dawncraft Wiki": "https://dawncraft.fandom.com/wiki/DawnCraft_Wiki",
-            "Pixelmon Wiki": "https://pixelmonmod.com/wiki/Main_Page",
-            "All the Mods Wiki": "https://ftb.fandom.com/wiki/All_the_Mods_(modpack)",
-            "Deceased Wiki": "https://deceasedcraft.wiki.gg/wiki/Main_Page",
-            "Prominence Wiki": "https://rpg.prominence.wiki/"
-        }
-        embed.add_field(name="Wikis", value="\n".join([f"[{name}]({url})" for name, url in wikis.items()]), inline=True)
-
-
-        # Other servers (no modpack required)
-        embed.add_field(name="Other", value=(
-            f"┕ {results[6]} Valheim:‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎ `valheim.nephbox.net`\n"
-            f"┕ {results[7]} Palworld:‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎`palworld.nephbox.net:8766`\n"
-            f"┕ {results[8]} Zomboid:‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎ ‎`zomboid.nephbox.net:19132`\n"
-            f"┕ {results[9]} Enshrouded: ‎ `enshrouded.nephbox.net:15637`"
-        ), inline=False)
-
-        # Additional information
-        embed.add_field(name="Additional Information", value=(
-            "If one of the servers are down and you want to play, open a support ticket! \n \n"
-            "Servers can be turned on quickly once I am aware of the issue. Please note that not "
-            "all servers are online 24/7 as they can be resource intensive."
-        ), inline=False)
-
-        # Embed footer and thumbnail
-        embed.set_thumbnail(url=str(self.bot.user.avatar))
-        embed.set_footer(text=f"Last Updated at {time} on {date}", icon_url=str(self.bot.user.avatar))
-
-        return embed
-
-    async def set_channel_and_message(self, channel_id, message_id):
-        async with aiosqlite.connect(db_path) as conn:
-            await conn.execute('''
-            INSERT INTO server_status (id, channel_id, message_id) VALUES (?, ?, ?)
-            ON CONFLICT(id) DO UPDATE SET channel_id = excluded.channel_id, message_id = excluded.message_id
-            ''', (1, channel_id, message_id))
-            await conn.commit()
-
-    # ---------------------------------------------------------------------------------------------------------------------
-# UPDATE COMMANDS
-# -------------------------------------------------------------------------------------------------------------------
-    @app_commands.checks.has_permissions(administrator=True)
-    @app_commands.command(description="Set the channel for server status updates and send the status message.")
-    async def server_message(self, interaction: discord.Interaction):
-        await interaction.response.defer()
-        embed = await self.construct_embed()
-        response = await interaction.followup.send(embed=embed, ephemeral=False)
-        await self.set_channel_and_message(interaction.channel.id, response.id)
-        await log_command_usage(self.bot, interaction)
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Setup function
-# ---------------------------------------------------------------------------------------------------------------------
-
-async def setup(bot):
-    async with aiosqlite.connect(db_path) as conn:
-        await conn.execute('''
-        CREATE TABLE IF NOT EXISTS server_status (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            channel_id INTEGER,
-            message_id INTEGER
-        )
-        ''')
-        await conn.commit()
-    await bot.add_cog(ServerUpdatesCog(bot))
+import discord
+import datetime
+import hashlib
+import logging
+import asyncio
+import json
+
+from discord import app_commands
+from dataclasses import dataclass
+from discord.ext import commands, tasks
+
+from cogs.customisation import get_embed_colour
+from core import db
+from core.monitor import scheduler, debounce
+from core.utils import log_command_usage
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Games the board knows how to probe, see probe_target
+GAME_TYPES = ("minecraft", "valheim", "palworld", "zomboid", "enshrouded", "vrising", "scp")
+
+# Seconds of probe results gathered into one edit while a new board fills in
+BOARD_EDIT_DEBOUNCE = 1.0
+
+# Tables a board is loaded from; resetting any of them reloads every board
+BOARD_TABLES = ('status_boards', 'status_board_servers', 'status_board_links')
+
+# Default text for a new board
+DEFAULT_BOARD_TITLE = "GAME SERVER LIST"
+DEFAULT_BOARD_NOTES = (
+    "If one of the servers are down and you want to play, open a support ticket! \n \n"
+    "Servers can be turned on quickly once I am aware of the issue. Please note that not "
+    "all servers are online 24/7 as they can be resource intensive."
+)
+
+# Board that used to be hardcoded here; seeded once for the guild of the old single status message
+LEGACY_BOARD_DESCRIPTION = "Passwords: `᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼᲼`"
+LEGACY_BOARD_SERVERS = [  # (group, label, game, host, port, address shown)
+    ("Minecraft", "Vanilla(ish)", "minecraft", "mc.nephbox.net", None, "mc.nephbox.net"),
+    ("Minecraft", "Dawncraft", "minecraft", "dawncraft.nephbox.net", None, "dawncraft.nephbox.net"),
+    ("Minecraft", "Pixelmon", "minecraft", "pixelmon.nephbox.net", None, "pixelmon.nephbox.net"),
+    ("Minecraft", "All the Mods", "minecraft", "allthemods.nephbox.net", None, "allthemods.nephbox.net"),
+    ("Minecraft", "Deceased", "minecraft", "deceased.nephbox.net", None, "deceased.nephbox.net"),
+    ("Minecraft", "Prominence", "minecraft", "prominence.nephbox.net", None, "prominence.nephbox.net"),
+    ("Other", "Valheim", "valheim", "192.168.0.40", 2456, "valheim.nephbox.net"),
+    ("Other", "Palworld", "palworld", "192.168.0.40", 8766, "palworld.nephbox.net:8766"),
+    ("Other", "Zomboid", "zomboid", "192.168.0.40", 19132, "zomboid.nephbox.net:19132"),
+    ("Other", "Enshrouded", "enshrouded", "82.14.1.253", 15637, "enshrouded.nephbox.net:15637"),
+]
+LEGACY_BOARD_LINKS = [  # (section, label, url)
+    ("Modpacks", "Dawncraft", "https://www.curseforge.com/minecraft/modpacks/dawn-craft"),
+    ("Modpacks", "Pixelmon", "https://www.curseforge.com/minecraft/modpacks/the-pixelmon-modpack"),
+    ("Modpacks", "All the Mods", "https://www.curseforge.com/minecraft/modpacks/all-the-mods-9"),
+    ("Modpacks", "Deceased", "https://www.curseforge.com/minecraft/modpacks/deceasedcraft"),
+    ("Modpacks", "Prominence", "https://www.curseforge.com/minecraft/modpacks/prominence-2-rpg"),
+    ("Wikis", "Dawncraft Wiki", "https://dawncraft.fandom.com/wiki/DawnCraft_Wiki"),
+    ("Wikis", "Pixelmon Wiki", "https://pixelmonmod.com/wiki/Main_Page"),
+    ("Wikis", "All the Mods Wiki", "https://ftb.fandom.com/wiki/All_the_Mods_(modpack)"),
+    ("Wikis", "Deceased Wiki", "https://deceasedcraft.wiki.gg/wiki/Main_Page"),
+    ("Wikis", "Prominence Wiki", "https://rpg.prominence.wiki/"),
+]
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Utility Functions (Updated for Async)
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+async def async_socket_connect(ip, port, timeout=5):
+    try:
+        conn = asyncio.open_connection(ip, port)
+        _, writer = await asyncio.wait_for(conn, timeout=timeout)
+        writer.close()
+        await writer.wait_closed()
+    except asyncio.TimeoutError:
+        logging.error(f"Timeout Error in async_socket_connect: Connection to {ip}:{port} timed out")
+    except Exception as e:
+        logging.error(f"Error in async_socket_connect: {e}")
+
+def probe_target(server_type, ip, port=None):
+    """Map a game to the (probe type, host, port) the shared probe scheduler checks it with."""
+    if server_type == "minecraft":
+        return "minecraft", ip, port
+    elif server_type == "valheim":
+        return "steam", ip, port + 1
+    elif server_type in ("zomboid", "enshrouded", "vrising"):
+        return "steam", ip, port
+    elif server_type == "palworld":
+        return "udp", ip, port
+    elif server_type == "scp":
+        return "tcp", ip, port
+    return None
+
+
+def status_emoji(result):
+    if result is None:
+        return ":hourglass_flowing_sand:"  # Not checked yet
+    return ":green_circle:" if result.online else ":red_circle:"
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Status Board
+# ---------------------------------------------------------------------------------------------------------------------
+# Each guild's board is defined by rows in status_boards, status_board_servers and status_board_links and kept in
+# memory. The embed is rendered from the probe scheduler's cached results, and the posted message is only edited when
+# the rendered content hashes differently from what was last sent, so an unchanged board costs no REST calls.
+
+
+@dataclass(frozen=True)
+class BoardServer:
+    id: int
+    group: str
+    label: str
+    game: str
+    host: str
+    port: int
+    address: str  # Address shown to players, which may differ from the host that is probed
+
+    @property
+    def target(self):
+        return probe_target(self.game, self.host, self.port)
+
+
+@dataclass(frozen=True)
+class BoardLink:
+    id: int
+    section: str
+    label: str
+    url: str
+
+
+@dataclass(frozen=True)
+class StatusBoard:
+    guild_id: int
+    channel_id: int = None
+    message_id: int = None
+    title: str = DEFAULT_BOARD_TITLE
+    description: str = None
+    notes: str = DEFAULT_BOARD_NOTES
+    servers: tuple = ()
+    links: tuple = ()
+
+    @property
+    def targets(self):
+        return {server.target for server in self.servers if server.target is not None}
+
+
+def grouped(items, key):
+    """Group items by `key`, keeping groups in the order they first appear."""
+    groups = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return groups
+
+
+def render_board(board, colour, thumbnail_url=None):
+    embed = discord.Embed(title=board.title, description=board.description, color=colour)
+
+    for group, servers in grouped(board.servers, lambda server: server.group).items():
+        lines = [f"┕ {status_emoji(scheduler.result(server.target))} {server.label}: `{server.address or server.host}`"
+                 for server in servers]
+        embed.add_field(name=group, value="\n".join(lines)[:1024], inline=False)
+
+    for section, links in grouped(board.links, lambda link: link.section).items():
+        embed.add_field(name=section, value="\n".join(f"[{link.label}]({link.url})" for link in links)[:1024],
+                        inline=True)
+
+    if board.notes:
+        embed.add_field(name="Additional Information", value=board.notes[:1024], inline=False)
+    if thumbnail_url:
+        embed.set_thumbnail(url=thumbnail_url)
+    return embed
+
+
+def board_digest(embed):
+    return hashlib.sha256(json.dumps(embed.to_dict(), sort_keys=True).encode()).hexdigest()
+
+# ---------------------------------------------------------------------------------------------------------------------
+# ServerUpdatesCog Class
+# ---------------------------------------------------------------------------------------------------------------------
+class ServerUpdatesCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.boards = {}  # guild_id -> StatusBoard
+        self.board_digests = {}  # guild_id -> digest of the board content last sent
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        await self.migrate_legacy_board()
+        scheduler.start()
+        if not self.update_status.is_running():
+            self.update_status.start()
+        logger.error(f"Game Servers - Message Task: Started")
+
+    async def cog_load(self):
+        await self.load_boards()
+        for table in BOARD_TABLES:
+            db.on_table_reset(table, self.reload_boards)
+
+    def cog_unload(self):
+        self.update_status.cancel()
+        for table in BOARD_TABLES:
+            db.remove_table_reset(table, self.reload_boards)
+        self.forget_boards()
+
+    async def load_boards(self):
+        for row in await db.fetchall('SELECT guild_id FROM status_boards'):
+            await self.load_board(row[0])
+
+    def forget_boards(self):
+        for guild_id in list(self.boards):
+            self.set_board(guild_id, None)
+
+    async def reload_boards(self):
+        # Forget first, so a dropped table leaves no stale boards behind even though reloading then fails
+        self.forget_boards()
+        await self.load_boards()
+
+    async def load_board(self, guild_id):
+        row = await db.fetchone('SELECT channel_id, message_id, title, description, notes FROM status_boards '
+                                'WHERE guild_id = ?', (guild_id,))
+        if row is None:
+            self.set_board(guild_id, None)
+            return None
+
+        servers = await db.fetchall('SELECT id, group_name, label, game, host, port, address FROM status_board_servers '
+                                    'WHERE guild_id = ? ORDER BY id', (guild_id,))
+        links = await db.fetchall('SELECT id, section, label, url FROM status_board_links WHERE guild_id = ? ORDER BY id',
+                                  (guild_id,))
+        board = StatusBoard(guild_id, *row, servers=tuple(BoardServer(*server) for server in servers),
+                            links=tuple(BoardLink(*link) for link in links))
+        self.set_board(guild_id, board)
+        return board
+
+    def set_board(self, guild_id, board):
+        """Swap in a guild's board, moving its probe scheduler registrations to match."""
+        previous = self.boards.pop(guild_id, None)
+        old_targets = previous.targets if previous else set()
+        new_targets = board.targets if board else set()
+
+        subscriber = (self.qualified_name, guild_id)
+        for target in old_targets - new_targets:
+            scheduler.unregister(target, subscriber)
+        for target in new_targets - old_targets:
+            scheduler.register(target, subscriber)
+
+        if board:
+            self.boards[guild_id] = board
+        else:
+            self.board_digests.pop(guild_id, None)
+
+    async def ensure_board(self, guild_id):
+        board = self.boards.get(guild_id)
+        if board is None:
+            await db.execute('INSERT OR IGNORE INTO status_boards (guild_id, title, notes) VALUES (?, ?, ?)',
+                             (guild_id, DEFAULT_BOARD_TITLE, DEFAULT_BOARD_NOTES))
+            board = await self.load_board(guild_id)
+        return board
+
+    async def migrate_legacy_board(self):
+        """Turn the old single status message into a board for the guild it was posted in."""
+        row = await db.fetchone('SELECT channel_id, message_id FROM server_status WHERE id = 1')
+        if not row:
+            return
+        channel = self.bot.get_channel(row[0])
+        if not channel:
+            return
+
+        guild_id = channel.guild.id
+        async with db.transaction() as conn:
+            if guild_id not in self.boards:
+                await conn.execute('''
+                INSERT INTO status_boards (guild_id, channel_id, message_id, title, description, notes)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ''', (guild_id, row[0], row[1], DEFAULT_BOARD_TITLE, LEGACY_BOARD_DESCRIPTION, DEFAULT_BOARD_NOTES))
+                await conn.executemany('''
+                INSERT INTO status_board_servers (guild_id, group_name, label, game, host, port, address)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [(guild_id, *server) for server in LEGACY_BOARD_SERVERS])
+                await conn.executemany('INSERT INTO status_board_links (guild_id, section, label, url) VALUES (?, ?, ?, ?)',
+                                       [(guild_id, *link) for link in LEGACY_BOARD_LINKS])
+            await conn.execute('DELETE FROM server_status WHERE id = 1')
+
+        await self.load_board(guild_id)
+        logger.info(f"Moved the legacy status message in {channel.guild.name} onto a status board")
+
+    @tasks.loop(minutes=1)
+    async def update_status(self):
+        for board in list(self.boards.values()):
+            try:
+                await self.refresh_board(board)
+            except Exception as e:
+                logger.error(f"Unhandled exception updating the status board for guild {board.guild_id}: {e}")
+
+    @update_status.before_loop
+    async def before_update_status(self):
+        await self.bot.wait_until_ready()
+
+    async def build_embed(self, board):
+        """Render a board from cached probe results. Returns (embed, digest); the digest leaves out the footer time."""
+        avatar = self.bot.user.display_avatar.url if self.bot.user else None
+        embed = render_board(board, await get_embed_colour(), avatar)
+        digest = board_digest(embed)
+
+        now = datetime.datetime.utcnow()
+        embed.set_footer(text=f"Last Updated at {now:%H:%M} on {now:%d/%m/%Y}", icon_url=avatar)
+        return embed, digest
+
+    async def refresh_board(self, board):
+        """Edit the posted board if its content changed since it was last sent."""
+        if not (board.channel_id and board.message_id):
+            return
+
+        embed, digest = await self.build_embed(board)
+        if digest == self.board_digests.get(board.guild_id):
+            return
+
+        channel = self.bot.get_channel(board.channel_id)
+        if not channel:
+            logger.error(f"Status board channel {board.channel_id} not found for guild {board.guild_id}")
+            return
+
+        try:
+            await channel.get_partial_message(board.message_id).edit(embed=embed)
+        except discord.NotFound:
+            logger.error(f"Status board message in guild {board.guild_id} was deleted; post it again with /server_message")
+            await db.execute('UPDATE status_boards SET message_id = NULL WHERE guild_id = ?', (board.guild_id,))
+            await self.load_board(board.guild_id)
+            return
+        self.board_digests[board.guild_id] = digest
+
+    async def board_changed(self, guild_id):
+        board = await self.load_board(guild_id)
+        if board:
+            await scheduler.probe_now(board.targets)
+            await self.refresh_board(board)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# UPDATE COMMANDS
+# ---------------------------------------------------------------------------------------------------------------------
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.command(description="Set the channel for server status updates and send the status message.")
+    @app_commands.describe(progressive="Post straight away and fill in servers as they are checked (default on)")
+    async def server_message(self, interaction: discord.Interaction, progressive: bool = True):
+        await interaction.response.defer()
+        board = await self.ensure_board(interaction.guild.id)
+
+        # Only servers the scheduler has not checked yet are probed here; the rest come from its cache
+        if not progressive:
+            await scheduler.probe_now(board.targets)
+        embed, digest = await self.build_embed(board)
+        response = await interaction.followup.send(embed=embed, ephemeral=False)
+
+        await db.execute('UPDATE status_boards SET channel_id = ?, message_id = ? WHERE guild_id = ?',
+                         (interaction.channel.id, response.id, interaction.guild.id))
+        board = await self.load_board(interaction.guild.id)
+        self.board_digests[interaction.guild.id] = digest
+        await log_command_usage(self.bot, interaction)
+
+        if progressive:
+            # Unchecked servers were posted as checking; fill them in as their probes finish
+            async for _ in debounce(scheduler.probe_as_completed(board.targets), BOARD_EDIT_DEBOUNCE):
+                board = self.boards.get(interaction.guild.id)
+                if board is None:
+                    break
+                await self.refresh_board(board)
+
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.command(description="Add a game server to the status board.")
+    @app_commands.describe(group="Heading the server is listed under", label="Name shown on the board",
+                           game=f"One of: {', '.join(GAME_TYPES)}", host="Host or IP the bot checks",
+                           port="Game port (optional for Minecraft)", address="Address shown to players, if different")
+    async def board_add_server(self, interaction: discord.Interaction, group: str, label: str, game: str, host: str,
+                               port: int = None, address: str = None):
+        game = game.lower()
+        if game not in GAME_TYPES:
+            await interaction.response.send_message(f"`Error: Unknown game, use one of {', '.join(GAME_TYPES)}`",
+                                                    ephemeral=True)
+            return
+        if port is None and game != "minecraft":
+            await interaction.response.send_message("`Error: A port is required for this game`", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        await self.ensure_board(interaction.guild.id)
+        await db.execute('''
+        INSERT INTO status_board_servers (guild_id, group_name, label, game, host, port, address)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (interaction.guild.id, group, label, game, host, port, address or (f"{host}:{port}" if port else host)))
+        await self.board_changed(interaction.guild.id)
+
+        await interaction.followup.send(f"`Success: Added {label} to the status board`", ephemeral=True)
+        await log_command_usage(self.bot, interaction)
+
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.command(description="Remove a game server from the status board.")
+    async def board_remove_server(self, interaction: discord.Interaction, label: str):
+        cursor = await db.execute('DELETE FROM status_board_servers WHERE guild_id = ? AND label = ?',
+                                  (interaction.guild.id, label))
+        if not cursor.rowcount:
+            await interaction.response.send_message(f"`Error: No server called {label} is on the board`", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        await self.board_changed(interaction.guild.id)
+        await interaction.followup.send(f"`Success: Removed {label} from the status board`", ephemeral=True)
+        await log_command_usage(self.bot, interaction)
+
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.command(description="Add a link to the status board.")
+    @app_commands.describe(section="Heading the link is listed under, e.g. Modpacks or Wikis")
+    async def board_add_link(self, interaction: discord.Interaction, section: str, label: str, url: str):
+        await interaction.response.defer(ephemeral=True)
+        await self.ensure_board(interaction.guild.id)
+        await db.execute('INSERT INTO status_board_links (guild_id, section, label, url) VALUES (?, ?, ?, ?)',
+                         (interaction.guild.id, section, label, url))
+        await self.board_changed(interaction.guild.id)
+
+        await interaction.followup.send(f"`Success: Added {label} to the status board`", ephemeral=True)
+        await log_command_usage(self.bot, interaction)
+
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.command(description="Remove a link from the status board.")
+    async def board_remove_link(self, interaction: discord.Interaction, label: str):
+        cursor = await db.execute('DELETE FROM status_board_links WHERE guild_id = ? AND label = ?',
+                                  (interaction.guild.id, label))
+        if not cursor.rowcount:
+            await interaction.response.send_message(f"`Error: No link called {label} is on the board`", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        await self.board_changed(interaction.guild.id)
+        await interaction.followup.send(f"`Success: Removed {label} from the status board`", ephemeral=True)
+        await log_command_usage(self.bot, interaction)
+
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.command(description="Change the status board's title, description or notes.")
+    async def board_text(self, interaction: discord.Interaction, title: str = None, description: str = None,
+                         notes: str = None):
+        await interaction.response.defer(ephemeral=True)
+        board = await self.ensure_board(interaction.guild.id)
+        await db.execute('UPDATE status_boards SET title = ?, description = ?, notes = ? WHERE guild_id = ?', (
+            title if title is not None else board.title,
+            description if description is not None else board.description,
+            notes if notes is not None else board.notes,
+            interaction.guild.id
+        ))
+        await self.board_changed(interaction.guild.id)
+
+        await interaction.followup.send("`Success: Status board updated`", ephemeral=True)
+        await log_command_usage(self.bot, interaction)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Setup function
+# ---------------------------------------------------------------------------------------------------------------------
+
+async def setup(bot):
+    async with db.transaction() as conn:
+        await conn.execute('''
+        CREATE TABLE IF NOT EXISTS server_status (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel_id INTEGER,
+            message_id INTEGER
+        )
+        ''')
+
+        await conn.execute('''
+        CREATE TABLE IF NOT EXISTS status_boards (
+            guild_id INTEGER PRIMARY KEY,
+            channel_id INTEGER,
+            message_id INTEGER,
+            title TEXT,
+            description TEXT,
+            notes TEXT
+        )
+        ''')
+
+        await conn.execute('''
+        CREATE TABLE IF NOT EXISTS status_board_servers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            group_name TEXT,
+            label TEXT,
+            game TEXT,
+            host TEXT,
+            port INTEGER,
+            address TEXT
+        )
+        ''')
+
+        await conn.execute('''
+        CREATE TABLE IF NOT EXISTS status_board_links (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            section TEXT,
+            label TEXT,
+            url TEXT
+        )
+        ''')
+
+    await bot.add_cog(ServerUpdatesCog(bot))
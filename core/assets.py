@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import tempfile
+
+from collections import OrderedDict
+from core import http
+from core.welcome import prepare_background
+
+# On-disk cache locations for welcome assets
+ASSET_CACHE_DIR = "data/cache/welcome"
+BACKGROUND_CACHE_DIR = os.path.join(ASSET_CACHE_DIR, "backgrounds")
+AVATAR_CACHE_DIR = os.path.join(ASSET_CACHE_DIR, "avatars")
+
+# Size avatars are requested at from the Discord CDN; the welcome image shows them at 100px
+AVATAR_FETCH_SIZE = 128
+
+# How many avatars are kept in memory and on disk
+MAX_MEMORY_AVATARS = 512
+MAX_DISK_AVATARS = 5000
+
+# Once the disk holds more than MAX_DISK_AVATARS, the oldest are pruned down to this many so pruning stays infrequent
+DISK_AVATARS_AFTER_PRUNE = MAX_DISK_AVATARS * 9 // 10
+
+# Seconds before a cached background is revalidated against its URL with If-None-Match
+BACKGROUND_REVALIDATE_AFTER = 6 * 60 * 60
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Disk Helpers
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+def _read_file(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_file(path, data):
+    # Write to a temporary file first so a crash never leaves a truncated cache entry behind. Each write gets its own
+    # temporary file, so two writes of the same entry never move each other's file away.
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix='.tmp', delete=False) as f:
+        temp_path = f.name
+        try:
+            f.write(data)
+        except OSError:
+            f.close()
+            _remove_files(temp_path)
+            raise
+    try:
+        os.replace(temp_path, path)
+    except OSError:
+        _remove_files(temp_path)
+        raise
+
+
+def _remove_files(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _prune_directory(directory, max_files):
+    """Delete the least recently modified files once a directory holds more than `max_files`.
+
+    Returns (files removed, files left).
+    """
+    try:
+        entries = [entry for entry in os.scandir(directory) if entry.is_file()]
+    except OSError:
+        return 0, 0
+    if len(entries) <= max_files:
+        return 0, len(entries)
+
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    stale = entries[:len(entries) - max_files]
+    _remove_files(*(entry.path for entry in stale))
+    return len(stale), max_files
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Welcome Asset Cache
+# ---------------------------------------------------------------------------------------------------------------------
+# Two tiers: memory first, then files under ASSET_CACHE_DIR that survive restarts. Backgrounds are stored already
+# decoded and resized to the welcome image size, so a join never decodes or resizes a background again. Avatars are
+# keyed by their Discord asset hash, which changes whenever the avatar does, so cached avatars never need revalidating.
+
+
+class WelcomeAssetCache:
+
+    def __init__(self, render_pool):
+        self.render_pool = render_pool
+        self.backgrounds = {}  # guild_id -> {'url', 'etag', 'last_modified', 'checked_at', 'mode', 'pixels'}
+        self.avatars = OrderedDict()  # avatar key -> PNG bytes, least recently used first
+        self.background_locks = {}
+        self.avatar_fetches = {}  # avatar key -> task loading it, shared by every join waiting for the same avatar
+        self.disk_avatars = 0  # Avatar files on disk, counted at startup and on every write
+        self.hits = 0
+        self.misses = 0
+
+    async def start(self):
+        os.makedirs(BACKGROUND_CACHE_DIR, exist_ok=True)
+        os.makedirs(AVATAR_CACHE_DIR, exist_ok=True)
+        await self.prune_avatars(MAX_DISK_AVATARS)
+
+    async def prune_avatars(self, max_files):
+        pruned, self.disk_avatars = await asyncio.to_thread(_prune_directory, AVATAR_CACHE_DIR, max_files)
+        if pruned:
+            logger.info(f"Pruned {pruned} cached avatars from disk")
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # Avatars
+    # -----------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def avatar_asset(member):
+        asset = member.avatar or member.default_avatar
+        return asset.with_size(AVATAR_FETCH_SIZE).with_static_format('png')
+
+    async def get_avatar(self, member):
+        asset = self.avatar_asset(member)
+        key = f"{asset.key}_{AVATAR_FETCH_SIZE}"
+
+        data = self.avatars.get(key)
+        if data is not None:
+            self.avatars.move_to_end(key)
+            self.hits += 1
+            return data
+
+        # Raids are mostly default avatars, which share a handful of keys, so concurrent misses share one load
+        task = self.avatar_fetches.get(key)
+        if task is None:
+            task = self.avatar_fetches[key] = asyncio.create_task(self._load_avatar(key, asset))
+            task.add_done_callback(lambda _: self.avatar_fetches.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _load_avatar(self, key, asset):
+        path = os.path.join(AVATAR_CACHE_DIR, f"{key}.png")
+        data = await asyncio.to_thread(_read_file, path)
+        if data is None:
+            self.misses += 1
+            data = await http.fetch_bytes(asset.url)
+            if data is None:
+                return None
+            try:
+                await asyncio.to_thread(_write_file, path, data)
+            except OSError as e:
+                # The avatar was fetched; failing to cache it on disk must not cost the member their welcome
+                logger.error(f"Failed to cache avatar {key} on disk: {e}")
+            else:
+                self.disk_avatars += 1
+                if self.disk_avatars > MAX_DISK_AVATARS:
+                    await self.prune_avatars(DISK_AVATARS_AFTER_PRUNE)
+        else:
+            self.hits += 1
+
+        self.avatars[key] = data
+        if len(self.avatars) > MAX_MEMORY_AVATARS:
+            self.avatars.popitem(last=False)
+        return data
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # Backgrounds
+    # -----------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def _background_paths(guild_id):
+        base = os.path.join(BACKGROUND_CACHE_DIR, str(guild_id))
+        return f"{base}.raw", f"{base}.json"
+
+    async def _load_background(self, guild_id, url):
+        pixels_path, meta_path = self._background_paths(guild_id)
+        meta = await asyncio.to_thread(_read_file, meta_path)
+        if meta is None:
+            return None
+        try:
+            entry = json.loads(meta)
+        except ValueError:
+            return None
+        if entry.get('url') != url:
+            return None
+
+        pixels = await asyncio.to_thread(_read_file, pixels_path)
+        if pixels is None:
+            return None
+        entry['pixels'] = pixels
+        return entry
+
+    async def _store_background(self, guild_id, entry, pixels=True):
+        pixels_path, meta_path = self._background_paths(guild_id)
+        meta = {key: value for key, value in entry.items() if key != 'pixels'}
+        try:
+            if pixels:
+                await asyncio.to_thread(_write_file, pixels_path, entry['pixels'])
+            await asyncio.to_thread(_write_file, meta_path, json.dumps(meta).encode())
+        except OSError as e:
+            logger.error(f"Failed to cache the welcome background of guild {guild_id} on disk: {e}")
+
+    async def _fetch_background(self, guild_id, url, cached):
+        etag = cached['etag'] if cached else None
+        last_modified = cached['last_modified'] if cached else None
+        status, body, etag, last_modified = await http.fetch_conditional(url, etag, last_modified)
+
+        if status == 304 and cached:
+            cached['checked_at'] = time.time()
+            await self._store_background(guild_id, cached, pixels=False)
+            return cached
+
+        if body is None:
+            # Keep serving a stale copy rather than dropping the image while the host is unreachable
+            return cached
+
+        try:
+            mode, pixels = await self.render_pool.run(prepare_background, body)
+        except Exception as e:
+            logger.error(f"Failed to decode welcome background for guild {guild_id} from {url}: {e}")
+            return cached
+
+        entry = {'url': url, 'etag': etag, 'last_modified': last_modified, 'checked_at': time.time(), 'mode': mode,
+                 'pixels': pixels}
+        await self._store_background(guild_id, entry)
+        return entry
+
+    async def get_background(self, guild_id, url):
+        """Return (mode, pixels) for the guild's background, resized to the welcome image size, or None."""
+        lock = self.background_locks.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            entry = self.backgrounds.get(guild_id)
+            if entry is None or entry['url'] != url:
+                entry = await self._load_background(guild_id, url)
+
+            if entry is None or time.time() - entry['checked_at'] >= BACKGROUND_REVALIDATE_AFTER:
+                self.misses += 1
+                entry = await self._fetch_background(guild_id, url, entry)
+            else:
+                self.hits += 1
+
+            if entry is None:
+                self.backgrounds.pop(guild_id, None)
+                return None
+            self.backgrounds[guild_id] = entry
+            return entry['mode'], entry['pixels']
+
+    async def invalidate_background(self, guild_id):
+        self.backgrounds.pop(guild_id, None)
+        await asyncio.to_thread(_remove_files, *self._background_paths(guild_id))
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+
+from core import db
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Authorisation Cache
+# ---------------------------------------------------------------------------------------------------------------------
+# The permissions table is loaded once per guild into a set of authorised user IDs. Because the whole guild is loaded,
+# a user missing from the set is a cached negative result, so after the first lookup in a guild every check is a set
+# membership test. grant() and revoke() write through to the database and update the set in place.
+
+_authorized = {}  # guild_id -> set of authorised user IDs
+_lock = asyncio.Lock()
+
+
+async def _load_guild(guild_id):
+    async with _lock:
+        if guild_id not in _authorized:
+            rows = await db.fetchall('''
+                SELECT user_id FROM permissions WHERE guild_id = ? AND can_use_commands = 1
+            ''', (guild_id,))
+            _authorized[guild_id] = {row[0] for row in rows}
+        return _authorized[guild_id]
+
+
+async def is_authorized(guild_id, user_id):
+    users = _authorized.get(guild_id)
+    if users is None:
+        users = await _load_guild(guild_id)
+    return user_id in users
+
+
+async def grant(guild_id, user_id):
+    async with _lock:
+        await db.execute('''
+            INSERT INTO permissions (guild_id, user_id, can_use_commands) VALUES (?, ?, 1)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET can_use_commands = 1
+        ''', (guild_id, user_id))
+        if guild_id in _authorized:
+            _authorized[guild_id].add(user_id)
+
+
+async def revoke(guild_id, user_id):
+    async with _lock:
+        await db.execute('''
+            UPDATE permissions SET can_use_commands = 0 WHERE guild_id = ? AND user_id = ?
+        ''', (guild_id, user_id))
+        if guild_id in _authorized:
+            _authorized[guild_id].discard(user_id)
+
+
+def invalidate(guild_id=None):
+    """Drop cached entries for one guild, or every guild, so they are reloaded on the next lookup."""
+    if guild_id is None:
+        _authorized.clear()
+    else:
+        _authorized.pop(guild_id, None)
+
+
+db.on_table_reset('permissions', invalidate)
@@ -0,0 +1,178 @@
+import os
+import asyncio
+import inspect
+import logging
+import itertools
+import aiosqlite
+
+from contextlib import asynccontextmanager
+
+# Ensure the database directory exists
+os.makedirs('./data/databases', exist_ok=True)
+
+# Path to the SQLite database
+db_path = './data/databases/serverfriend.db'
+
+# Number of read-only connections kept open alongside the single writer
+READER_COUNT = 2
+
+# Size of the per-connection prepared statement cache
+STATEMENT_CACHE_SIZE = 256
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Connection Pool
+# ---------------------------------------------------------------------------------------------------------------------
+# Every aiosqlite connection owns a background thread, so the bot keeps a small fixed set of them open for its whole
+# lifetime instead of connecting per query. Writes are serialised through one connection so that a statement and its
+# commit can never interleave with another task's transaction; reads are spread over the reader connections, which
+# see every committed write thanks to WAL.
+
+_writer = None
+_readers = []
+_reader_cycle = None
+_write_lock = asyncio.Lock()
+_open_lock = asyncio.Lock()
+
+
+async def _connect():
+    conn = await aiosqlite.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE)
+    await conn.execute('PRAGMA journal_mode=WAL')
+    await conn.execute('PRAGMA synchronous=NORMAL')
+    await conn.execute('PRAGMA busy_timeout=5000')
+    await conn.execute('PRAGMA temp_store=MEMORY')
+    return conn
+
+
+async def open_pool():
+    """Open the shared connections. Safe to call more than once."""
+    global _writer, _readers, _reader_cycle
+
+    async with _open_lock:
+        if _writer is not None:
+            return
+
+        _writer = await _connect()
+        _readers = [await _connect() for _ in range(READER_COUNT)]
+        _reader_cycle = itertools.cycle(_readers)
+        logger.info(f"Opened database pool at {db_path} with {READER_COUNT} readers")
+
+
+async def close_pool():
+    """Close every shared connection, checkpointing the WAL on the way out."""
+    global _writer, _readers, _reader_cycle
+
+    async with _open_lock:
+        if _writer is None:
+            return
+
+        async with _write_lock:
+            try:
+                await _writer.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            except aiosqlite.Error as e:
+                logger.error(f"Failed to checkpoint database on close: {e}")
+
+            for conn in [_writer, *_readers]:
+                await conn.close()
+
+        _writer = None
+        _readers = []
+        _reader_cycle = None
+
+
+async def _reader():
+    if _writer is None:
+        await open_pool()
+    return next(_reader_cycle)
+
+
+async def _get_writer():
+    if _writer is None:
+        await open_pool()
+    return _writer
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Query Helpers
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+async def fetchone(query, params=()):
+    conn = await _reader()
+    async with conn.execute(query, params) as cursor:
+        return await cursor.fetchone()
+
+
+async def fetchall(query, params=()):
+    conn = await _reader()
+    async with conn.execute(query, params) as cursor:
+        return await cursor.fetchall()
+
+
+async def execute(query, params=()):
+    """Run a single write statement and commit it. Returns the cursor for `lastrowid`/`rowcount`."""
+    conn = await _get_writer()
+    async with _write_lock:
+        cursor = await conn.execute(query, params)
+        await conn.commit()
+        await cursor.close()
+        return cursor
+
+
+async def executemany(query, params_seq):
+    conn = await _get_writer()
+    async with _write_lock:
+        cursor = await conn.executemany(query, params_seq)
+        await conn.commit()
+        await cursor.close()
+        return cursor
+
+
+@asynccontextmanager
+async def transaction():
+    """Hold the writer for several statements and commit them together, rolling back on error."""
+    conn = await _get_writer()
+    async with _write_lock:
+        try:
+            yield conn
+        except Exception:
+            await conn.rollback()
+            raise
+        else:
+            await conn.commit()
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Table Reset Hooks
+# ---------------------------------------------------------------------------------------------------------------------
+# Modules and cogs that keep a table's rows in memory register a callback for that table. /reset_table and
+# /delete_table run the table's callbacks, so a cached copy never outlives the rows it was loaded from.
+
+_reset_hooks = {}  # table name -> callbacks
+
+
+def on_table_reset(table, callback):
+    """Call `callback()` whenever every row of `table` is deleted or the table is dropped. It may be a coroutine."""
+    hooks = _reset_hooks.setdefault(table, [])
+    if callback not in hooks:
+        hooks.append(callback)
+
+
+def remove_table_reset(table, callback):
+    hooks = _reset_hooks.get(table, [])
+    if callback in hooks:
+        hooks.remove(callback)
+
+
+async def table_reset(table):
+    """Drop everything cached from `table`. Call after the table has been emptied or dropped."""
+    for callback in list(_reset_hooks.get(table, ())):
+        try:
+            result = callback()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"Failed to clear cached rows of {table} with {callback}: {e}")
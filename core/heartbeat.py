@@ -0,0 +1,145 @@
+import hmac
+import json
+import time
+import asyncio
+import hashlib
+import logging
+
+from core import probes
+from core.monitor import MAX_BACKOFF, scheduler, parse_target_name
+
+# Seconds between heartbeats when a packet does not say, and how many a server may miss before it is marked down
+HEARTBEAT_INTERVAL = 30
+HEARTBEAT_GRACE = 3
+
+# Longest interval a packet may ask for, so one heartbeat cannot stop a target being probed for longer than a back-off
+MAX_HEARTBEAT_INTERVAL = MAX_BACKOFF
+
+# Largest difference allowed between a packet's timestamp and the bot's clock, in seconds
+MAX_CLOCK_SKEW = 60
+
+# Largest heartbeat datagram accepted
+MAX_HEARTBEAT_SIZE = 1024
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Heartbeat Packets
+# ---------------------------------------------------------------------------------------------------------------------
+# A heartbeat is one UDP datagram: the hex HMAC-SHA256 of a JSON body under the shared secret, a space, then the body.
+#
+#   {"target": "steam:192.168.0.40:2457", "ts": 1700000000.0, "online": true, "players": 3, "max_players": 10,
+#    "name": "My Server", "interval": 30}
+#
+# `target` names the registered probe target it reports for, as "type:host:port". `ts` must be close to the bot's clock
+# and must increase from one packet to the next for the same target, so a captured packet cannot be replayed. Fields
+# of the wrong type reject the packet instead of being coerced, so "online": "false" never reads as up.
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_optional(value, kind):
+    return value is None or (isinstance(value, kind) and not isinstance(value, bool))
+
+
+def sign_heartbeat(body, secret):
+    """Build a heartbeat datagram for a JSON-serialisable `body`. Game hosts running Python can use this to send."""
+    payload = json.dumps(body, separators=(',', ':')).encode()
+    signature = hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest().encode()
+    return signature + b' ' + payload
+
+
+def parse_heartbeat(data, secret, now=None):
+    """Check and decode a heartbeat datagram. Returns (key, ts, ProbeResult, interval), or None if it is invalid."""
+    if len(data) > MAX_HEARTBEAT_SIZE:
+        return None
+    signature, _, payload = data.partition(b' ')
+    expected = hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest().encode()
+    if not hmac.compare_digest(signature, expected):
+        return None
+
+    try:
+        body = json.loads(payload)
+        key = parse_target_name(body['target'])
+        ts = body['ts']
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+    interval = body.get('interval', HEARTBEAT_INTERVAL)
+    online = body.get('online', True)
+    if key is None or not _is_number(ts) or not _is_number(interval) or interval <= 0 or not isinstance(online, bool):
+        return None
+    if not (_is_optional(body.get('players'), int) and _is_optional(body.get('max_players'), int)
+            and _is_optional(body.get('name'), str)):
+        return None
+    if abs((time.time() if now is None else now) - ts) > MAX_CLOCK_SKEW:
+        return None
+
+    result = probes.ProbeResult(online=online, players=body.get('players'), max_players=body.get('max_players'),
+                                name=body.get('name'))
+    return key, float(ts), result, min(float(interval), MAX_HEARTBEAT_INTERVAL)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Heartbeat Listener
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+class _HeartbeatProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, listener):
+        self.listener = listener
+
+    def datagram_received(self, data, addr):
+        self.listener.receive(data, addr)
+
+
+class HeartbeatListener:
+    """Receives heartbeats on a local UDP port and hands them to the probe scheduler."""
+
+    def __init__(self):
+        self.secret = None
+        self.transport = None
+        self.last_seen = {}  # key -> ts of the newest accepted heartbeat
+        self.accepted = 0
+        self.rejected = 0
+
+    async def start(self, host, port, secret):
+        if self.transport is not None:
+            return
+        self.secret = secret
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: _HeartbeatProtocol(self),
+                                                                local_addr=(host, port))
+        logger.info(f"Listening for server heartbeats on {host}:{port}")
+
+    def receive(self, data, addr):
+        heartbeat = parse_heartbeat(data, self.secret)
+        if heartbeat is None:
+            self.rejected += 1
+            logger.debug(f"Rejected heartbeat from {addr[0]}")
+            return
+
+        key, ts, result, interval = heartbeat
+        if ts <= self.last_seen.get(key, 0):
+            self.rejected += 1
+            logger.debug(f"Rejected replayed heartbeat for {key} from {addr[0]}")
+            return
+
+        self.last_seen[key] = ts
+        if scheduler.push(key, result, interval * HEARTBEAT_GRACE):
+            self.accepted += 1
+        else:
+            logger.debug(f"Heartbeat for {key} from {addr[0]} does not match a monitored server")
+
+    def stop(self):
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+
+heartbeats = HeartbeatListener()
@@ -0,0 +1,221 @@
+import time
+import asyncio
+import logging
+
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from core import db
+from core.monitor import scheduler, target_name
+
+# Seconds between writes of buffered probe results, and between compaction passes
+FLUSH_INTERVAL = 30
+COMPACT_INTERVAL = 60
+
+# How long per-minute and per-hour rollups are kept
+MINUTE_RETENTION = 2 * 24 * 60 * 60
+HOUR_RETENTION = 90 * 24 * 60 * 60
+
+# Longest stretch of time one result is taken to cover, so a gap in probing (or the bot being down) is not counted
+MAX_SAMPLE_SPAN = 600
+
+# Upper bounds in milliseconds of the latency histogram buckets, about 20% apart from 1ms to ~5s, plus an overflow
+LATENCY_BUCKETS = tuple(round(1.2 ** i, 1) for i in range(48))
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Rollups
+# ---------------------------------------------------------------------------------------------------------------------
+# Availability is weighted by time rather than by sample count, because failing targets are probed less often while
+# they back off. Latencies are kept as fixed-bucket histograms, which merge by adding counts, so percentiles over any
+# range can be read from minute and hour rollups without keeping individual results.
+
+
+class Rollup:
+    __slots__ = ('seconds', 'up_seconds', 'latencies')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.up_seconds = 0.0
+        self.latencies = array('I', bytes(4 * (len(LATENCY_BUCKETS) + 1)))
+
+    def add(self, online, latency, span):
+        self.seconds += span
+        if online:
+            self.up_seconds += span
+        if latency is not None:
+            self.latencies[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def merge(self, seconds, up_seconds, latencies):
+        self.seconds += seconds
+        self.up_seconds += up_seconds
+        counts = array('I', latencies)
+        for index, count in enumerate(counts):
+            self.latencies[index] += count
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of latencies, or None with no latencies."""
+        total = sum(self.latencies)
+        if not total:
+            return None
+
+        wanted = fraction * total
+        seen = 0
+        for index, count in enumerate(self.latencies):
+            seen += count
+            if seen >= wanted:
+                return LATENCY_BUCKETS[min(index, len(LATENCY_BUCKETS) - 1)]
+        return LATENCY_BUCKETS[-1]
+
+
+@dataclass(frozen=True)
+class UptimeReport:
+    seconds: float
+    availability: float  # Fraction of the covered time the target was up
+    p50: float = None
+    p95: float = None
+    p99: float = None
+
+
+def _group(rows, width, combine):
+    """Fold rows of (target, timestamp, *values) into one Rollup per target and `width`-second period."""
+    rollups = {}
+    for target, timestamp, *values in rows:
+        key = (target, int(timestamp // width * width))
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = rollups[key] = Rollup()
+        combine(rollup, *values)
+    return rollups
+
+
+async def _write_rollups(conn, table, column, rollups):
+    """Insert rollups into `table`, merging into any rows already stored for the same target and period."""
+    if not rollups:
+        return
+
+    periods = [period for _, period in rollups]
+    async with conn.execute(f'SELECT target, {column}, seconds, up_seconds, latencies FROM {table} '
+                            f'WHERE {column} BETWEEN ? AND ?', (min(periods), max(periods))) as cursor:
+        for target, period, *values in await cursor.fetchall():
+            if (target, period) in rollups:
+                rollups[(target, period)].merge(*values)
+
+    await conn.executemany(f'INSERT OR REPLACE INTO {table} (target, {column}, seconds, up_seconds, latencies) '
+                           f'VALUES (?, ?, ?, ?, ?)',
+                           [(target, period, rollup.seconds, rollup.up_seconds, rollup.latencies.tobytes())
+                            for (target, period), rollup in rollups.items()])
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Probe History
+# ---------------------------------------------------------------------------------------------------------------------
+# Published probe results are buffered in memory and written in batches to probe_samples. A sample row credits the
+# time since the target's previous result to the state of that previous result, which is what the target was known to
+# be in over that span, and carries the latency of the new result if it was up. The compactor folds finished
+# minutes into probe_minutes and deletes the raw rows, then folds minutes of finished hours into probe_hours and marks
+# them rolled. Queries read hours plus the not yet rolled minutes, so they never touch raw rows.
+
+
+class ProbeHistory:
+
+    def __init__(self):
+        self.buffer = []
+        self.last_sample = {}  # target name -> (time, online) of its last recorded result
+        self.compacted_at = 0
+        self.task = None
+
+    async def record(self, results):
+        """Probe scheduler listener: buffer every published result."""
+        now = time.time()
+        for key, result in results.items():
+            name = target_name(key)
+            previous = self.last_sample.get(name)
+            self.last_sample[name] = (now, result.online)
+            if previous is None:
+                online, span = result.online, 0  # Nothing is known about the time before a target's first result
+            else:
+                online, span = previous[1], min(now - previous[0], MAX_SAMPLE_SPAN)
+            latency = result.latency if result.online else None
+            self.buffer.append((name, now, int(online), latency, span))
+
+    async def flush(self):
+        if not self.buffer:
+            return
+        rows, self.buffer = self.buffer, []
+        await db.executemany('INSERT INTO probe_samples (target, ts, online, latency, span) VALUES (?, ?, ?, ?, ?)',
+                             rows)
+
+    async def compact(self, now=None):
+        now = time.time() if now is None else now
+        await self.flush()
+        minute_cutoff = int(now // 60 * 60)
+        hour_cutoff = int(now // 3600 * 3600)
+
+        async with db.transaction() as conn:
+            async with conn.execute('SELECT target, ts, online, latency, span FROM probe_samples WHERE ts < ?',
+                                    (minute_cutoff,)) as cursor:
+                samples = await cursor.fetchall()
+            await _write_rollups(conn, 'probe_minutes', 'minute', _group(samples, 60, Rollup.add))
+            await conn.execute('DELETE FROM probe_samples WHERE ts < ?', (minute_cutoff,))
+
+            async with conn.execute('SELECT target, minute, seconds, up_seconds, latencies FROM probe_minutes '
+                                    'WHERE rolled = 0 AND minute < ?', (hour_cutoff,)) as cursor:
+                minutes = await cursor.fetchall()
+            await _write_rollups(conn, 'probe_hours', 'hour', _group(minutes, 3600, Rollup.merge))
+            await conn.execute('UPDATE probe_minutes SET rolled = 1 WHERE rolled = 0 AND minute < ?', (hour_cutoff,))
+
+            await conn.execute('DELETE FROM probe_minutes WHERE minute < ?', (now - MINUTE_RETENTION,))
+            await conn.execute('DELETE FROM probe_hours WHERE hour < ?', (now - HOUR_RETENTION,))
+
+        self.compacted_at = now
+        logger.debug(f"Compacted {len(samples)} probe samples and {len(minutes)} minute rollups")
+
+    async def uptime(self, key, period, now=None):
+        """Availability and latency percentiles of a target over the last `period` seconds, or None without data."""
+        now = time.time() if now is None else now
+        name = target_name(key)
+        since = now - period
+
+        rollup = Rollup()
+        for row in await db.fetchall('SELECT seconds, up_seconds, latencies FROM probe_hours '
+                                     'WHERE target = ? AND hour >= ?', (name, since // 3600 * 3600)):
+            rollup.merge(*row)
+        for row in await db.fetchall('SELECT seconds, up_seconds, latencies FROM probe_minutes '
+                                     'WHERE target = ? AND rolled = 0 AND minute >= ?', (name, since // 60 * 60)):
+            rollup.merge(*row)
+
+        if not rollup.seconds:
+            return None
+        return UptimeReport(rollup.seconds, rollup.up_seconds / rollup.seconds, rollup.percentile(0.5),
+                            rollup.percentile(0.95), rollup.percentile(0.99))
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            try:
+                if time.time() - self.compacted_at >= COMPACT_INTERVAL:
+                    await self.compact()
+                else:
+                    await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write probe history: {e}")
+
+    def start(self):
+        scheduler.add_listener(self.record)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        scheduler.remove_listener(self.record)
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        await self.flush()
+
+
+history = ProbeHistory()
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import aiohttp
+
+# Connection pool limits for the shared client session
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 10
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+
+# Request timeouts in seconds
+TOTAL_TIMEOUT = 15
+CONNECT_TIMEOUT = 5
+
+# Largest response body fetch_bytes will read, in bytes
+MAX_RESPONSE_SIZE = 8 * 1024 * 1024
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Shared Client Session
+# ---------------------------------------------------------------------------------------------------------------------
+# One session for all outbound HTTP so connections, TLS sessions and DNS lookups are reused between requests instead
+# of paying a new handshake for every avatar or background image.
+
+_session = None
+
+
+async def open_session():
+    global _session
+
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            limit_per_host=MAX_CONNECTIONS_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=TOTAL_TIMEOUT, connect=CONNECT_TIMEOUT),
+            raise_for_status=False
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+async def get_session():
+    if _session is None or _session.closed:
+        return await open_session()
+    return _session
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Request Helpers
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+async def read_limited(response, max_size=MAX_RESPONSE_SIZE):
+    """Read a response body, returning None if it is larger than `max_size` bytes."""
+    if response.content_length is not None and response.content_length > max_size:
+        return None
+
+    body = bytearray()
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        body += chunk
+        if len(body) > max_size:
+            return None
+    return bytes(body)
+
+
+async def fetch_bytes(url, max_size=MAX_RESPONSE_SIZE):
+    """GET `url` and return the body, or None on a non-200 status, a timeout, or a body over `max_size` bytes."""
+    session = await get_session()
+    try:
+        async with session.get(url) as resp:
+            if resp.status != 200:
+                logger.warning(f"GET {url} returned {resp.status}")
+                return None
+
+            body = await read_limited(resp, max_size)
+            if body is None:
+                logger.warning(f"GET {url} exceeded {max_size} bytes")
+            return body
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"GET {url} failed: {e}")
+        return None
+
+
+async def fetch_conditional(url, etag=None, last_modified=None, max_size=MAX_RESPONSE_SIZE):
+    """Revalidating GET. Returns (status, body, etag, last_modified); body is None for 304 and on any failure."""
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    session = await get_session()
+    try:
+        async with session.get(url, headers=headers) as resp:
+            if resp.status == 304:
+                return 304, None, etag, last_modified
+            if resp.status != 200:
+                logger.warning(f"GET {url} returned {resp.status}")
+                return resp.status, None, None, None
+
+            body = await read_limited(resp, max_size)
+            if body is None:
+                logger.warning(f"GET {url} exceeded {max_size} bytes")
+                return resp.status, None, None, None
+            return resp.status, body, resp.headers.get('ETag'), resp.headers.get('Last-Modified')
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"GET {url} failed: {e}")
+        return None, None, None, None
@@ -1,30 +1,30 @@
-import discord
-import os
-import datetime
-
-from discord import app_commands
-from discord.ext import commands
-
-from config import client
-
-
-class TheMachineBotCore(commands.Cog):
-
-    def __init__(self, bot):
-        self.bot = bot
-
-#  ---------------------------------------------------------------------------------------------------------
-#  ---------------------------------------------------------------------------------------------------------
-#  ---------------------------------------------------------------------------------------------------------
-
-    @commands.Cog.listener()
-    async def on_ready(self):
-        print(f'Logged on as {self.bot.user}...')
-
-#  ---------------------------------------------------------------------------------------------------------
-#  ---------------------------------------------------------------------------------------------------------------------
-#  ---------------------------------------------------------------------------------------------------------------------
-
-
-async def setup(bot):
-    await bot.add_cog(TheMachineBotCore(bot))
+import discord
+import os
+import datetime
+
+from discord import app_commands
+from discord.ext import commands
+
+from config import client
+
+
+class TheMachineBotCore(commands.Cog):
+
+    def __init__(self, bot):
+        self.bot = bot
+
+#  ---------------------------------------------------------------------------------------------------------
+#  ---------------------------------------------------------------------------------------------------------
+#  ---------------------------------------------------------------------------------------------------------
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        print(f'Logged on as {self.bot.user}...')
+
+#  ---------------------------------------------------------------------------------------------------------
+#  ---------------------------------------------------------------------------------------------------------------------
+#  ---------------------------------------------------------------------------------------------------------------------
+
+
+async def setup(bot):
+    await bot.add_cog(TheMachineBotCore(bot))
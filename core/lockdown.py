@@ -0,0 +1,96 @@
+import time
+import asyncio
+import logging
+import discord
+
+from dataclasses import dataclass
+from core import db
+
+# Role edits in flight at once during a lockdown or unlock
+LOCKDOWN_CONCURRENCY = 8
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Lockdown Engine
+# ---------------------------------------------------------------------------------------------------------------------
+# Every role's permission value is written to lockdown_snapshots before anything is touched, and a role already in the
+# snapshot keeps its first value, so running /lockdown twice never records the locked-down state. Edits then run
+# concurrently: discord.py tracks each route's rate limit bucket from the response headers and holds requests once a
+# bucket is spent, and LOCKDOWN_CONCURRENCY caps how many are queued on it at once. Unlock restores exactly the
+# snapshot values with the same engine, and forgets a role's snapshot only once it has been restored.
+
+
+@dataclass(frozen=True)
+class LockdownResult:
+    edited: int
+    failed: tuple  # Roles whose edit failed
+    seconds: float
+
+
+def lockable_roles(guild):
+    """Roles the bot can edit: everything below its top role except @everyone."""
+    top_role = guild.me.top_role
+    return [role for role in guild.roles if role != guild.default_role and role < top_role]
+
+
+async def apply_permissions(edits, reason, progress=None):
+    """Edit roles to the given permissions concurrently. `progress` is awaited with (done, total) after each edit."""
+    semaphore = asyncio.Semaphore(LOCKDOWN_CONCURRENCY)
+    failed = []
+    done = 0
+    started = time.perf_counter()
+
+    async def edit(role, permissions):
+        nonlocal done
+        async with semaphore:
+            try:
+                await role.edit(permissions=permissions, reason=reason)
+            except discord.HTTPException as e:
+                logger.error(f"Failed to edit permissions of role {role.name} ({role.id}): {e}")
+                failed.append(role)
+        done += 1
+        if progress is not None:
+            await progress(done, len(edits))
+
+    await asyncio.gather(*(edit(role, permissions) for role, permissions in edits))
+    return LockdownResult(len(edits) - len(failed), tuple(failed), time.perf_counter() - started)
+
+
+async def lock_guild(guild, reason, progress=None):
+    roles = lockable_roles(guild)
+    await db.executemany('INSERT OR IGNORE INTO lockdown_snapshots (guild_id, role_id, permissions, taken_at) '
+                         'VALUES (?, ?, ?, ?)', [(guild.id, role.id, role.permissions.value, time.time())
+                                                 for role in roles])
+
+    edits = [(role, discord.Permissions.none()) for role in roles if role.permissions.value]
+    result = await apply_permissions(edits, reason, progress)
+    logger.warning(f"Locked down {result.edited} roles in {guild.name} ({guild.id}) in {result.seconds:.1f}s, "
+                   f"{len(result.failed)} failed")
+    return result
+
+
+async def unlock_guild(guild, reason, progress=None):
+    """Restore every role in the guild's snapshot. Returns None if the guild has no snapshot."""
+    rows = await db.fetchall('SELECT role_id, permissions FROM lockdown_snapshots WHERE guild_id = ?', (guild.id,))
+    if not rows:
+        return None
+
+    edits = []
+    for role_id, value in rows:
+        role = guild.get_role(role_id)
+        if role is not None and role.permissions.value != value:
+            edits.append((role, discord.Permissions(value)))
+    result = await apply_permissions(edits, reason, progress)
+
+    # Roles that failed keep their snapshot so running unlock again retries them
+    failed_ids = {role.id for role in result.failed}
+    await db.executemany('DELETE FROM lockdown_snapshots WHERE guild_id = ? AND role_id = ?',
+                         [(guild.id, role_id) for role_id, _ in rows if role_id not in failed_ids])
+    logger.warning(f"Restored {result.edited} roles in {guild.name} ({guild.id}) in {result.seconds:.1f}s, "
+                   f"{len(result.failed)} failed")
+    return result
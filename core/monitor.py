@@ -0,0 +1,330 @@
+import asyncio
+import logging
+import random
+import time
+
+from dataclasses import dataclass, field
+from core import probes
+
+# Seconds between probes of a healthy target, the longest back-off for a failing one, and how soon a change of state
+# is probed again to confirm it
+PROBE_INTERVAL = 10
+MAX_BACKOFF = 300
+CONFIRM_DELAY = 2
+
+# Back-off delays are spread by up to this fraction either way so failing targets do not all retry together
+BACKOFF_JITTER = 0.2
+
+# Seconds between checks for targets that are due
+SCHEDULER_TICK = 1
+
+# Circuit breaker states: closed while a target answers, open while it is down and backing off, half-open while a
+# change of state waits for a confirming probe
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half-open"
+
+# Most probes in flight at once
+MAX_CONCURRENT_PROBES = 64
+
+# Error recorded for a target whose pushed heartbeats stopped arriving
+MISSED_HEARTBEAT = "missed heartbeat"
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Probe Scheduler
+# ---------------------------------------------------------------------------------------------------------------------
+# Both server status cogs register the servers they display here instead of probing them themselves. A target is one
+# unique (probe type, host, port), so a server watched by several guilds or by both cogs is probed once when due.
+# Healthy targets are probed every PROBE_INTERVAL; failing ones back off exponentially so a dead server stops costing
+# a full timeout every few seconds. A result that flips a target's state is only published once a quick second probe
+# agrees with it. After every tick the published results are handed to each listener, and the latest confirmed result
+# of every target stays readable. A target has at most one probe in flight: ticks and the probe_now and
+# probe_as_completed helpers all share it, and whatever it publishes reaches the listeners with the next tick.
+#
+# Servers can also push their own status (see core/heartbeat.py). A target with a live heartbeat is not probed; if the
+# heartbeat is not renewed within its window the target is marked down and falls back to active probing.
+
+
+def target_name(key):
+    """A probe target as "type:host:port", as used in probe history and heartbeat packets."""
+    probe_type, host, port = key
+    return f"{probe_type}:{host}:{port or ''}"
+
+
+def parse_target_name(name):
+    """Inverse of target_name. Returns None if `name` is not a valid target name."""
+    probe_type, _, address = name.partition(':')
+    host, _, port = address.rpartition(':')
+    if not (probe_type and host):
+        return None
+    try:
+        return probe_type, host, int(port) if port else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class ProbeTarget:
+    probe_type: str
+    host: str
+    port: int
+    subscribers: set = field(default_factory=set)
+    result: probes.ProbeResult = None
+    checked_at: float = None
+    failures: int = 0
+    unconfirmed: probes.ProbeResult = None  # A result that disagrees with `result`, waiting for a confirming probe
+    next_probe_at: float = 0.0
+    heartbeat_deadline: float = None  # While set, pushed heartbeats stand in for probing until this time
+    in_flight: asyncio.Task = None  # The probe running for this target, shared by everything that asks for one
+
+    @property
+    def key(self):
+        return self.probe_type, self.host, self.port
+
+    @property
+    def breaker(self):
+        if self.unconfirmed is not None:
+            return BREAKER_HALF_OPEN
+        if self.result is not None and not self.result.online:
+            return BREAKER_OPEN
+        return BREAKER_CLOSED
+
+
+class ProbeScheduler:
+
+    def __init__(self, interval=PROBE_INTERVAL, max_concurrency=MAX_CONCURRENT_PROBES):
+        self.interval = interval
+        self.targets = {}  # (probe_type, host, port) -> ProbeTarget
+        self.listeners = []
+        self.unpublished = {}  # Results pushed or probed since the last tick, published with it
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.task = None
+        self.last_tick_duration = 0
+
+    def register(self, key, subscriber):
+        target = self.targets.get(key)
+        if target is None:
+            target = self.targets[key] = ProbeTarget(*key)
+        target.subscribers.add(subscriber)
+        return target
+
+    def unregister(self, key, subscriber):
+        target = self.targets.get(key)
+        if target is None:
+            return
+        target.subscribers.discard(subscriber)
+        if not target.subscribers:
+            del self.targets[key]
+
+    def result(self, key):
+        target = self.targets.get(key)
+        return target.result if target else None
+
+    def describe(self, key):
+        """One line summary of a target's state and breaker, for status commands."""
+        target = self.targets.get(key)
+        if target is None or target.result is None:
+            return "not checked yet"
+
+        result = target.result
+        if result.online:
+            summary = f"up, {result.latency:.0f}ms" if result.latency is not None else "up"
+            if result.players is not None:
+                summary += f", {result.players}/{result.max_players} players"
+        else:
+            summary = f"down ({result.error}), {target.failures} failed checks"
+
+        next_probe = max(0, target.next_probe_at - time.monotonic())
+        if target.heartbeat_deadline is not None:
+            return f"{summary}; pushing heartbeats, next due within {next_probe:.0f}s"
+        return f"{summary}; breaker {target.breaker}, next check in {next_probe:.0f}s"
+
+    def add_listener(self, callback):
+        """`callback` is awaited after every tick with a dict of (probe_type, host, port) -> ProbeResult."""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # Probing
+    # -----------------------------------------------------------------------------------------------------------------
+
+    def backoff(self, target):
+        if target.result is None or target.result.online:
+            return self.interval
+        delay = min(MAX_BACKOFF, self.interval * 2 ** (target.failures - 1))
+        return delay * random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER)
+
+    def record(self, target, result):
+        """Store a probe result and schedule the next probe. Returns False while a change of state is unconfirmed."""
+        now = time.monotonic()
+        target.checked_at = time.time()
+
+        previous = target.result
+        if previous is not None and previous.online != result.online and target.unconfirmed is None:
+            target.unconfirmed = result
+            target.next_probe_at = now + CONFIRM_DELAY
+            return False
+
+        if previous is not None and previous.online != result.online:
+            logger.info(f"{target.key} is now {'up' if result.online else 'down'}")
+        target.result = result
+        target.unconfirmed = None
+        target.failures = 0 if result.online else target.failures + 1
+        target.next_probe_at = now + self.backoff(target)
+        return True
+
+    def push(self, key, result, window):
+        """Record a result a server pushed itself, and skip probing it for `window` seconds. False if unregistered."""
+        target = self.targets.get(key)
+        if target is None:
+            return False
+
+        now = time.monotonic()
+        if target.result is not None and target.result.online != result.online:
+            logger.info(f"{target.key} reported itself {'up' if result.online else 'down'}")
+        target.result = result
+        target.checked_at = time.time()
+        target.unconfirmed = None
+        target.failures = 0 if result.online else target.failures + 1
+        target.heartbeat_deadline = target.next_probe_at = now + window
+        self.unpublished[key] = result
+        return True
+
+    def miss_heartbeat(self, target, now):
+        logger.info(f"{target.key} missed its heartbeat, falling back to probing")
+        target.heartbeat_deadline = None
+        target.result = probes.offline(MISSED_HEARTBEAT)
+        target.checked_at = time.time()
+        target.failures += 1
+        target.next_probe_at = now + self.backoff(target)
+        return target.result
+
+    async def _probe(self, target):
+        try:
+            async with self.semaphore:
+                try:
+                    result = await probes.probe(target.probe_type, target.host, target.port)
+                except Exception as e:
+                    logger.error(f"Probe of {target.key} failed: {e}")
+                    result = probes.offline(str(e))
+            if self.record(target, result) and self.targets.get(target.key) is target:
+                self.unpublished[target.key] = target.result
+        finally:
+            target.in_flight = None
+
+    async def probe_target(self, target):
+        """Probe a target, or wait for the probe already in flight for it."""
+        if target.in_flight is None:
+            target.in_flight = asyncio.create_task(self._probe(target))
+        # Shielded, so a caller that gives up does not cancel a probe other callers are waiting for
+        await asyncio.shield(target.in_flight)
+
+    async def probe_as_completed(self, keys):
+        """Probe the given registered targets that have no result yet, yielding (key, result) as each one finishes."""
+        pending = [self.targets[key] for key in keys if key in self.targets and self.targets[key].result is None]
+
+        async def probe(target):
+            await self.probe_target(target)
+            return target.key
+
+        for probed in asyncio.as_completed([probe(target) for target in pending]):
+            key = await probed
+            yield key, self.result(key)
+
+    async def probe_now(self, keys):
+        """Probe the given registered targets that have no result yet, and wait for them."""
+        pending = [self.targets[key] for key in keys if key in self.targets and self.targets[key].result is None]
+        if pending:
+            await asyncio.gather(*(self.probe_target(target) for target in pending))
+
+    async def tick(self):
+        now = time.monotonic()
+        for target in self.targets.values():
+            if target.heartbeat_deadline is not None and target.heartbeat_deadline <= now:
+                self.unpublished[target.key] = self.miss_heartbeat(target, now)
+
+        due = [target for target in self.targets.values() if target.next_probe_at <= now]
+        if due:
+            started = time.perf_counter()
+            await asyncio.gather(*(self.probe_target(target) for target in due))
+            self.last_tick_duration = time.perf_counter() - started
+            logger.debug(f"Probed {len(due)} of {len(self.targets)} targets in {self.last_tick_duration * 1000:.0f}ms")
+
+        # Everything published since the last tick: this tick's probes, heartbeats, and probes run by the helpers
+        results, self.unpublished = self.unpublished, {}
+        if not results:
+            return results
+
+        for callback in list(self.listeners):
+            asyncio.create_task(self.publish(callback, results))
+        return results
+
+    async def publish(self, callback, results):
+        try:
+            await callback(results)
+        except Exception as e:
+            logger.error(f"Probe listener {callback.__qualname__} failed: {e}")
+
+    async def run(self):
+        while True:
+            await self.tick()
+            await asyncio.sleep(SCHEDULER_TICK)
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+
+scheduler = ProbeScheduler()
+
+
+async def debounce(items, delay):
+    """Regroup an async iterator into lists, each holding what arrived within `delay` seconds of its first item."""
+    queue = asyncio.Queue()
+    finished = object()
+
+    async def drain():
+        try:
+            async for item in items:
+                queue.put_nowait(item)
+        finally:
+            queue.put_nowait(finished)
+
+    loop = asyncio.get_running_loop()
+    task = asyncio.create_task(drain())
+    try:
+        while True:
+            item = await queue.get()
+            if item is finished:
+                return
+
+            batch = [item]
+            deadline = loop.time() + delay
+            while item is not finished and loop.time() < deadline:
+                try:
+                    item = await asyncio.wait_for(queue.get(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    break
+                if item is not finished:
+                    batch.append(item)
+            yield batch
+
+            if item is finished:
+                return
+    finally:
+        task.cancel()
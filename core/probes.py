@@ -0,0 +1,286 @@
+import asyncio
+import ipaddress
+import logging
+import struct
+import time
+
+import dns.exception
+from dataclasses import dataclass
+from mcstatus.address import Address, async_minecraft_srv_address_lookup
+from mcstatus.dns import async_resolve_a_record
+from mcstatus.pinger import AsyncServerPinger
+from mcstatus.protocol.connection import TCPAsyncSocketConnection
+
+# Default time allowed for one probe, from resolving the address to reading the reply
+PROBE_TIMEOUT = 5.0
+
+# Source engine A2S_INFO request, and the payload sent to plain UDP servers
+A2S_INFO_REQUEST = b'\xFF\xFF\xFF\xFFTSource Engine Query\x00'
+UDP_PING_PAYLOAD = b"Test packet"
+
+# Largest datagram read from a probed server
+MAX_DATAGRAM_SIZE = 4096
+
+# Minecraft Java servers: port used when there is no SRV record, and how long resolved addresses are reused
+MINECRAFT_DEFAULT_PORT = 25565
+MINECRAFT_DNS_TTL = 300
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Probe Results
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    online: bool
+    latency: float = None  # Milliseconds from sending the probe to reading the reply
+    players: int = None
+    max_players: int = None
+    name: str = None
+    error: str = None
+
+
+def offline(error):
+    return ProbeResult(online=False, error=error)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# UDP Transport
+# ---------------------------------------------------------------------------------------------------------------------
+# Every probe gets its own connected datagram endpoint on the event loop, so hundreds of probes can be in flight at
+# once without holding a thread each. The endpoint resolves the reply future on the first datagram, or fails it when
+# the OS reports an ICMP error such as port unreachable, which marks a server down without waiting for the deadline.
+
+
+class _DatagramProbe(asyncio.DatagramProtocol):
+
+    def __init__(self):
+        self.replies = asyncio.Queue()
+        self.error = None
+
+    def datagram_received(self, data, addr):
+        self.replies.put_nowait(data)
+
+    def error_received(self, exc):
+        self.error = exc
+        self.replies.put_nowait(None)
+
+    def connection_lost(self, exc):
+        self.replies.put_nowait(None)
+
+
+class _UDPExchange:
+    """One connected UDP socket that can send a request and wait for the reply, within a shared deadline."""
+
+    def __init__(self, transport, protocol, deadline):
+        self.transport = transport
+        self.protocol = protocol
+        self.deadline = deadline
+
+    async def request(self, payload):
+        self.transport.sendto(payload)
+        remaining = self.deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError
+        data = await asyncio.wait_for(self.protocol.replies.get(), remaining)
+        if data is None:
+            raise self.protocol.error or ConnectionError("Socket closed")
+        return data
+
+
+async def _open_exchange(ip, port, deadline):
+    loop = asyncio.get_running_loop()
+    transport, protocol = await asyncio.wait_for(
+        loop.create_datagram_endpoint(_DatagramProbe, remote_addr=(ip, port)),
+        max(0.0, deadline - loop.time())
+    )
+    return _UDPExchange(transport, protocol, deadline)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# A2S_INFO
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+def _read_string(data, offset):
+    end = data.index(b'\x00', offset)
+    return data[offset:end].decode('utf-8', 'replace'), end + 1
+
+
+def parse_a2s_info(data):
+    """Parse an A2S_INFO reply (header 'I') into a dict, or return None if it is not one."""
+    if len(data) < 6 or data[:4] != b'\xFF\xFF\xFF\xFF' or data[4:5] != b'I':
+        return None
+
+    try:
+        offset = 6  # Header and protocol version
+        name, offset = _read_string(data, offset)
+        map_name, offset = _read_string(data, offset)
+        folder, offset = _read_string(data, offset)
+        game, offset = _read_string(data, offset)
+        app_id, players, max_players, bots = struct.unpack_from('<hBBB', data, offset)
+    except (ValueError, struct.error):
+        return None
+
+    return {
+        'name': name,
+        'map': map_name,
+        'folder': folder,
+        'game': game,
+        'app_id': app_id,
+        'players': players,
+        'max_players': max_players,
+        'bots': bots
+    }
+
+
+async def query_a2s_info(ip, port, timeout=PROBE_TIMEOUT):
+    """Query a Source engine server with A2S_INFO, following the challenge handshake newer servers require."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    exchange = None
+    started = time.perf_counter()
+    try:
+        exchange = await _open_exchange(ip, port, deadline)
+        reply = await exchange.request(A2S_INFO_REQUEST)
+
+        # S2C_CHALLENGE: resend the request with the 4-byte challenge appended
+        if reply[:5] == b'\xFF\xFF\xFF\xFFA' and len(reply) >= 9:
+            reply = await exchange.request(A2S_INFO_REQUEST + reply[5:9])
+        latency = (time.perf_counter() - started) * 1000
+
+        info = parse_a2s_info(reply)
+        if info is None:
+            # Something answered on the port, so count the server as up even if the reply was not A2S_INFO
+            return ProbeResult(online=True, latency=latency)
+        return ProbeResult(online=True, latency=latency, players=info['players'], max_players=info['max_players'],
+                           name=info['name'])
+    except asyncio.TimeoutError:
+        return offline("timeout")
+    except OSError as e:
+        return offline(str(e))
+    finally:
+        if exchange is not None:
+            exchange.transport.close()
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Generic Probes
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+async def udp_ping(ip, port, timeout=PROBE_TIMEOUT, payload=UDP_PING_PAYLOAD):
+    """Send one datagram and count the server as up if anything comes back."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    exchange = None
+    started = time.perf_counter()
+    try:
+        exchange = await _open_exchange(ip, port, deadline)
+        await exchange.request(payload)
+        return ProbeResult(online=True, latency=(time.perf_counter() - started) * 1000)
+    except asyncio.TimeoutError:
+        return offline("timeout")
+    except OSError as e:
+        return offline(str(e))
+    finally:
+        if exchange is not None:
+            exchange.transport.close()
+
+
+async def tcp_connect(ip, port, timeout=PROBE_TIMEOUT):
+    """Count the server as up if a TCP connection can be opened."""
+    started = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except asyncio.TimeoutError:
+        return offline("timeout")
+    except OSError as e:
+        return offline(str(e))
+
+    latency = (time.perf_counter() - started) * 1000
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return ProbeResult(online=True, latency=latency)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Minecraft
+# ---------------------------------------------------------------------------------------------------------------------
+# SRV and A records are resolved with the async DNS resolver and cached for MINECRAFT_DNS_TTL, so a status check is
+# normally one TCP exchange. The handshake still carries the original hostname, which proxies use to route players.
+
+_minecraft_addresses = {}  # (address, port) -> (expires_at, hostname, ip, port)
+
+
+async def resolve_minecraft(address, port=None, timeout=PROBE_TIMEOUT):
+    """Resolve a Minecraft server address to (hostname, ip, port), following its SRV record when no port is given."""
+    key = (address, port)
+    cached = _minecraft_addresses.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1:]
+
+    target = await async_minecraft_srv_address_lookup(f"{address}:{port}" if port else address,
+                                                      default_port=MINECRAFT_DEFAULT_PORT, lifetime=timeout)
+    try:
+        ipaddress.ip_address(target.host)
+        ip = target.host
+    except ValueError:
+        try:
+            ip = await async_resolve_a_record(target.host, lifetime=timeout)
+        except dns.exception.DNSException:
+            # Names the DNS resolver cannot see, such as hosts file entries, fall back to the system resolver
+            infos = await asyncio.get_running_loop().getaddrinfo(target.host, target.port)
+            ip = infos[0][4][0]
+
+    _minecraft_addresses[key] = (time.monotonic() + MINECRAFT_DNS_TTL, target.host, ip, target.port)
+    return target.host, ip, target.port
+
+
+async def _minecraft_status(address, port, timeout):
+    hostname, ip, port = await resolve_minecraft(address, port, timeout)
+    async with TCPAsyncSocketConnection(Address(ip, port), timeout) as connection:
+        pinger = AsyncServerPinger(connection, address=Address(hostname, port))
+        pinger.handshake()
+        return await pinger.read_status()
+
+
+async def minecraft_status(address, port=None, timeout=PROBE_TIMEOUT):
+    """Run a Server List Ping against a Minecraft Java server, returning latency, player counts and the MOTD."""
+    try:
+        status = await asyncio.wait_for(_minecraft_status(address, port, timeout), timeout)
+    except asyncio.TimeoutError:
+        result = offline("timeout")
+    except (OSError, ValueError, dns.exception.DNSException) as e:
+        result = offline(str(e) or type(e).__name__)
+    else:
+        return ProbeResult(online=True, latency=status.latency, players=status.players.online,
+                           max_players=status.players.max, name=status.motd.to_plain())
+
+    # The address may have moved; resolve it again on the next check
+    _minecraft_addresses.pop((address, port), None)
+    return result
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------------------------------------------------
+
+PROBES = {
+    'minecraft': minecraft_status,
+    'steam': query_a2s_info,
+    'udp': udp_ping,
+    'tcp': tcp_connect
+}
+
+
+async def probe(probe_type, host, port, timeout=PROBE_TIMEOUT):
+    """Run the probe registered for `probe_type` in PROBES."""
+    probe_function = PROBES.get(probe_type)
+    if probe_function is None:
+        return offline(f"unknown server type {probe_type}")
+    return await probe_function(host, port, timeout=timeout)
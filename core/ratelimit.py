@@ -0,0 +1,297 @@
+import sys
+import time
+
+from array import array
+from collections import OrderedDict, deque
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Rate Limiting Primitives
+# ---------------------------------------------------------------------------------------------------------------------
+# Windows expire their own events lazily when they are touched, and idle keys are evicted through a timer wheel, so
+# the cost of recording an event does not depend on how many keys are being tracked and no periodic sweep is needed.
+
+
+class SlidingWindow:
+    """Exact count of events in the last `window` seconds, backed by a deque of timestamps."""
+
+    __slots__ = ('window', 'events')
+
+    def __init__(self, window):
+        self.window = window
+        self.events = deque()
+
+    def _expire(self, now):
+        events = self.events
+        while events and now - events[0] >= self.window:
+            events.popleft()
+
+    def hit(self, now):
+        self._expire(now)
+        self.events.append(now)
+        return len(self.events)
+
+    def count(self, now):
+        self._expire(now)
+        return len(self.events)
+
+    def expires_at(self):
+        return self.events[-1] + self.window if self.events else 0
+
+    def retry_after(self, limit, now):
+        """Seconds until fewer than `limit` events remain inside the window."""
+        self._expire(now)
+        if len(self.events) < limit:
+            return 0.0
+        return self.events[-limit] + self.window - now
+
+
+class BucketedCounter:
+    """Approximate count for long windows, kept in a fixed number of buckets instead of one entry per event."""
+
+    __slots__ = ('window', 'width', 'counts', 'head', 'total', 'last')
+
+    def __init__(self, window, buckets=60):
+        self.window = window
+        self.width = window / buckets
+        self.counts = [0] * buckets
+        self.head = None
+        self.total = 0
+        self.last = 0
+
+    def _advance(self, now):
+        # Clear the buckets that time has moved past since the last call, at most one full rotation
+        epoch = int(now / self.width)
+        if self.head is None:
+            self.head = epoch
+            return epoch % len(self.counts)
+
+        bucket_count = len(self.counts)
+        for stale in range(self.head + 1, min(epoch, self.head + bucket_count) + 1):
+            index = stale % bucket_count
+            self.total -= self.counts[index]
+            self.counts[index] = 0
+        self.head = max(self.head, epoch)
+        return epoch % bucket_count
+
+    def hit(self, now):
+        index = self._advance(now)
+        self.counts[index] += 1
+        self.total += 1
+        self.last = now
+        return self.total
+
+    def count(self, now):
+        self._advance(now)
+        return self.total
+
+    def expires_at(self):
+        return self.last + self.window
+
+
+class TimerWheel:
+    """Hashed timer wheel: keys are dropped into the slot for their deadline and collected as time moves past it."""
+
+    def __init__(self, tick=1.0, slots=512):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.current = None
+
+    def schedule(self, key, deadline):
+        target = int(deadline / self.tick)
+        if self.current is None:
+            self.current = target - 1
+        elif target <= self.current:
+            target = self.current + 1
+        self.slots[target % len(self.slots)].append((target, key))
+
+    def advance(self, now):
+        """Return every key whose deadline has passed. Walks at most one rotation of slots per call."""
+        now_tick = int(now / self.tick)
+        if self.current is None or now_tick <= self.current:
+            return []
+
+        expired = []
+        slot_count = len(self.slots)
+        for step in range(1, min(now_tick - self.current, slot_count) + 1):
+            index = (self.current + step) % slot_count
+            slot = self.slots[index]
+            if not slot:
+                continue
+
+            pending = []
+            for target, key in slot:
+                if target <= now_tick:
+                    expired.append(key)
+                else:
+                    pending.append((target, key))
+            self.slots[index] = pending
+
+        self.current = now_tick
+        return expired
+
+
+class RateLimiter:
+    """Per-key event windows with lazy expiry and timer-wheel eviction of idle keys."""
+
+    def __init__(self, window, buckets=None, tick=1.0):
+        self.window = window
+        self.buckets = buckets
+        self.windows = {}
+        self.wheel = TimerWheel(tick)
+
+    def __len__(self):
+        return len(self.windows)
+
+    def __contains__(self, key):
+        return key in self.windows
+
+    def _new_window(self, window):
+        if self.buckets:
+            return BucketedCounter(window, self.buckets)
+        return SlidingWindow(window)
+
+    def evict(self, now):
+        for key in self.wheel.advance(now):
+            counter = self.windows.get(key)
+            if counter is None:
+                continue
+            if counter.expires_at() <= now:
+                del self.windows[key]
+            else:
+                self.wheel.schedule(key, counter.expires_at())
+
+    def hit(self, key, now=None, window=None):
+        """Record an event for `key` and return how many events it has inside its window."""
+        if now is None:
+            now = time.monotonic()
+        self.evict(now)
+
+        counter = self.windows.get(key)
+        if counter is None:
+            counter = self.windows[key] = self._new_window(window or self.window)
+            count = counter.hit(now)
+            self.wheel.schedule(key, counter.expires_at())
+            return count
+        return counter.hit(now)
+
+    def count(self, key, now=None):
+        counter = self.windows.get(key)
+        if counter is None:
+            return 0
+        return counter.count(time.monotonic() if now is None else now)
+
+    def retry_after(self, key, limit, now=None):
+        """Seconds until `key` is back under `limit` events. Only exact (unbucketed) windows support this."""
+        counter = self.windows.get(key)
+        if counter is None:
+            return 0.0
+        return counter.retry_after(limit, time.monotonic() if now is None else now)
+
+    def reset(self, key):
+        self.windows.pop(key, None)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Bounded Per-Key State
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+class TTLCache:
+    """Bounded mapping that drops entries idle for `ttl` seconds and the least recently used entry once full."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (last_used, value), least recently used first
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def evict(self, now):
+        # Entries are kept in last-used order, so idle ones are always at the front
+        entries = self.entries
+        while entries:
+            last_used, _ = next(iter(entries.values()))
+            if now - last_used < self.ttl and len(entries) <= self.maxsize:
+                break
+            entries.popitem(last=False)
+
+    def get(self, key, now=None):
+        if now is None:
+            now = time.monotonic()
+        self.evict(now)
+
+        item = self.entries.get(key)
+        if item is None:
+            return None
+        self.entries[key] = (now, item[1])
+        self.entries.move_to_end(key)
+        return item[1]
+
+    def set(self, key, value, now=None):
+        if now is None:
+            now = time.monotonic()
+        self.entries[key] = (now, value)
+        self.entries.move_to_end(key)
+        self.evict(now)
+
+    def pop(self, key, default=None):
+        item = self.entries.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self):
+        self.entries.clear()
+
+
+class _RingBuffer:
+    __slots__ = ('times', 'position', 'filled')
+
+    def __init__(self, capacity):
+        self.times = array('d', bytes(8 * capacity))
+        self.position = 0
+        self.filled = 0
+
+
+class MessageRateTracker:
+    """Keeps only the last `limit + 1` timestamps per key in a fixed-size array, inside a TTLCache."""
+
+    def __init__(self, maxsize=50_000, ttl=120):
+        self.cache = TTLCache(maxsize, ttl)
+
+    def __len__(self):
+        return len(self.cache)
+
+    def hit(self, key, limit, window, now=None):
+        """Record an event and return True if more than `limit` events fell inside the last `window` seconds."""
+        if now is None:
+            now = time.monotonic()
+
+        capacity = limit + 1
+        ring = self.cache.get(key, now)
+        if ring is None or len(ring.times) != capacity:
+            ring = _RingBuffer(capacity)
+            self.cache.set(key, ring, now)
+
+        ring.times[ring.position] = now
+        ring.position = (ring.position + 1) % capacity
+        if ring.filled < capacity:
+            ring.filled += 1
+            if ring.filled < capacity:
+                return False
+
+        # The slot after the newest timestamp holds the oldest of the last `capacity` events
+        return now - ring.times[ring.position] < window
+
+    def reset(self, key):
+        self.cache.pop(key)
+
+    def memory_usage(self):
+        """Approximate bytes held by the tracker, including keys, entries and buffers."""
+        size = sys.getsizeof(self.cache.entries)
+        for key, item in self.cache.entries.items():
+            ring = item[1]
+            size += sys.getsizeof(key) + sys.getsizeof(item) + sys.getsizeof(ring) + sys.getsizeof(ring.times)
+        return size
@@ -0,0 +1,112 @@
+import time
+import logging
+import discord
+
+from collections import deque
+from core import db
+
+# Name of the role that strips a member's permissions while they are restricted
+RESTRICTED_ROLE_NAME = "Restricted"
+
+# How many recent restriction timings are kept for reporting
+TIMING_HISTORY = 100
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Restricted Role
+# ---------------------------------------------------------------------------------------------------------------------
+# The role is looked up by a cached ID and created ahead of time where protection is enabled, so restricting someone
+# mid-incident is a single member edit with no role search or role creation in front of it.
+
+_restricted_roles = {}  # guild_id -> Restricted role id
+
+
+def restricted_role(guild):
+    """The guild's Restricted role, or None if it does not exist yet."""
+    role = guild.get_role(_restricted_roles.get(guild.id, 0))
+    if role is None:
+        role = discord.utils.get(guild.roles, name=RESTRICTED_ROLE_NAME)
+        if role is None:
+            return None
+        _restricted_roles[guild.id] = role.id
+    return role
+
+
+async def ensure_restricted_role(guild):
+    role = restricted_role(guild)
+    if role is None:
+        role = await guild.create_role(name=RESTRICTED_ROLE_NAME, permissions=discord.Permissions.none(),
+                                       reason="Prepared for restricting members")
+        _restricted_roles[guild.id] = role.id
+        logger.info(f"Created the {RESTRICTED_ROLE_NAME} role in {guild.name} ({guild.id})")
+    return role
+
+
+def is_restricted(member):
+    role = restricted_role(member.guild)
+    return role is not None and role in member.roles
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Restricting and Restoring Members
+# ---------------------------------------------------------------------------------------------------------------------
+
+recent_timings = deque(maxlen=TIMING_HISTORY)  # Milliseconds from trigger to restricted, most recent last
+
+
+async def _store_roles(guild_id, user_id, role_ids):
+    await db.execute('''
+        INSERT INTO restricted_users (user_id, guild_id, role_ids)
+        VALUES (?, ?, ?)
+        ON CONFLICT(user_id, guild_id) DO UPDATE SET role_ids = excluded.role_ids
+    ''', (user_id, guild_id, ','.join(map(str, role_ids))))
+
+
+async def restrict_member(guild, member, reason, triggered_at=None):
+    """Swap all of a member's roles for the Restricted role in one edit.
+
+    Returns the milliseconds from `triggered_at` (a time.perf_counter() value) to the edit completing, or None if the
+    member was already restricted. The previous roles are written to restricted_users before the edit, so they can
+    always be restored; if the edit fails, that row is removed again.
+    """
+    started = time.perf_counter() if triggered_at is None else triggered_at
+    role = restricted_role(guild) or await ensure_restricted_role(guild)
+    if role in member.roles:
+        return None  # Already restricted; the stored roles must not be overwritten
+
+    previous = [r for r in member.roles if r != guild.default_role]
+    # Managed roles (integrations, boosters) cannot be taken away by anyone, so they are left in place
+    kept = [r for r in previous if r.managed]
+    await _store_roles(guild.id, member.id, [r.id for r in previous if not r.managed])
+    try:
+        await member.edit(roles=[role, *kept], reason=reason)
+    except Exception:
+        await db.execute('DELETE FROM restricted_users WHERE user_id = ? AND guild_id = ?', (member.id, guild.id))
+        raise
+
+    elapsed = (time.perf_counter() - started) * 1000
+    recent_timings.append(elapsed)
+    logger.warning(f"Restricted {member.name} ({member.id}) in {guild.name} ({guild.id}) {elapsed:.0f}ms after "
+                   f"the trigger: {reason}")
+    return elapsed
+
+
+async def restore_member(guild, member, reason):
+    """Give a restricted member back their stored roles in one edit. Returns False if no roles were stored."""
+    row = await db.fetchone('SELECT role_ids FROM restricted_users WHERE user_id = ? AND guild_id = ?',
+                            (member.id, guild.id))
+    if not row:
+        return False
+
+    role = restricted_role(guild)
+    stored = [guild.get_role(int(role_id)) for role_id in row[0].split(',') if role_id.isdigit()]
+    roles = {r for r in member.roles if r != role and r != guild.default_role}
+    roles.update(r for r in stored if r is not None and not r.managed)
+    await member.edit(roles=list(roles), reason=reason)
+
+    await db.execute('DELETE FROM restricted_users WHERE user_id = ? AND guild_id = ?', (member.id, guild.id))
+    return True
@@ -0,0 +1,333 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from io import BytesIO
+from PIL import Image, ImageDraw, ImageFont
+
+# Default output size of the welcome image
+DEFAULT_BACKGROUND_SIZE = (500, 250)
+
+# Font used for the welcome text overlay
+FONT_PATH = "data/welcome/Roboto-Regular.ttf"
+FONT_SIZE = 24
+
+# Avatar layout: a ring AVATAR_SIZE across with the avatar inset by AVATAR_BORDER, placed AVATAR_TOP from the top
+AVATAR_SIZE = 100
+AVATAR_BORDER = 5
+AVATAR_TOP = 50
+
+# Masks are drawn this many times larger and downsampled, which gives them anti-aliased edges
+MASK_SUPERSAMPLE = 4
+
+# Compiled templates each worker process keeps
+MAX_COMPILED_TEMPLATES = 64
+
+# Join burst collage layout: up to COLLAGE_COLUMNS x COLLAGE_ROWS avatars of COLLAGE_AVATAR_SIZE pixels
+COLLAGE_AVATAR_SIZE = 44
+COLLAGE_SPACING = 8
+COLLAGE_COLUMNS = 8
+COLLAGE_ROWS = 3
+COLLAGE_MAX_AVATARS = COLLAGE_COLUMNS * COLLAGE_ROWS
+
+# Output formats a guild can pick for its welcome images, mapped to their file extension
+IMAGE_FORMATS = {
+    'png': 'png',
+    'png_optimized': 'png',
+    'png_quantized': 'png',
+    'webp': 'webp'
+}
+DEFAULT_IMAGE_FORMAT = 'png'
+DEFAULT_IMAGE_QUALITY = 80
+
+# Worker processes rendering welcome images, and how many renders may be queued or running before new ones are dropped
+RENDER_WORKERS = 2
+MAX_PENDING_RENDERS = 8
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Logging Configuration
+# ---------------------------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Render Spec
+# ---------------------------------------------------------------------------------------------------------------------
+# A WelcomeTemplate holds a guild's welcome settings and is built once per settings change; a WelcomeRenderSpec adds
+# the per-join avatar and name. Both are plain data so they can be pickled to a worker process.
+
+
+@dataclass(frozen=True)
+class WelcomeTemplate:
+    key: tuple  # Unique per guild and settings version; workers cache the compiled template under it
+    text_overlay: str
+    text_color: str
+    avatar_ring_colour: str
+    background_colour: str
+    background: bytes = None  # Decoded DEFAULT_BACKGROUND_SIZE pixels from prepare_background; else background_colour
+    background_mode: str = 'RGB'
+    image_format: str = DEFAULT_IMAGE_FORMAT
+    image_quality: int = DEFAULT_IMAGE_QUALITY
+
+
+@dataclass(frozen=True)
+class WelcomeRenderSpec:
+    template: WelcomeTemplate
+    avatar: bytes
+    display_name: str
+
+
+@dataclass(frozen=True)
+class WelcomeCollageSpec:
+    template: WelcomeTemplate
+    avatars: tuple  # At most COLLAGE_MAX_AVATARS avatar images
+    member_count: int
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+def prepare_background(data):
+    """Decode and resize a background image once, returning (mode, raw pixels) at DEFAULT_BACKGROUND_SIZE."""
+    background = Image.open(BytesIO(data)).resize(DEFAULT_BACKGROUND_SIZE, Image.LANCZOS)
+    if background.mode not in ('RGB', 'RGBA'):
+        background = background.convert('RGBA' if 'A' in background.getbands() else 'RGB')
+    return background.mode, background.tobytes()
+
+
+def circle_mask(size):
+    """Anti-aliased circular alpha mask `size` pixels across."""
+    large = size * MASK_SUPERSAMPLE
+    mask = Image.new('L', (large, large), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, large - 1, large - 1), fill=255)
+    return mask.resize((size, size), Image.LANCZOS)
+
+
+class CompiledTemplate:
+    """The parts of a welcome image that only change with the guild's settings, ready to be copied per join."""
+
+    def __init__(self, template):
+        if template.background:
+            self.base = Image.frombytes(template.background_mode, DEFAULT_BACKGROUND_SIZE, template.background)
+        else:
+            self.base = Image.new('RGB', DEFAULT_BACKGROUND_SIZE, color=template.background_colour)
+        self.background = self.base.copy()
+
+        # Draw the avatar ring onto the background once
+        self.ring_position = ((self.base.width - AVATAR_SIZE) // 2, AVATAR_TOP)
+        ring = Image.new('RGBA', (AVATAR_SIZE, AVATAR_SIZE), template.avatar_ring_colour)
+        self.base.paste(ring, self.ring_position, circle_mask(AVATAR_SIZE))
+
+        self.avatar_size = AVATAR_SIZE - AVATAR_BORDER * 2
+        self.avatar_position = (self.ring_position[0] + AVATAR_BORDER, self.ring_position[1] + AVATAR_BORDER)
+        self.avatar_mask = circle_mask(self.avatar_size)
+        self.collage_mask = circle_mask(COLLAGE_AVATAR_SIZE)
+
+        self.font = load_font(FONT_PATH, FONT_SIZE)
+        self.text_overlay = template.text_overlay
+        self.text_color = template.text_color
+        self.text_top = AVATAR_TOP + AVATAR_SIZE + 10
+
+
+_fonts = {}
+_compiled_templates = OrderedDict()
+
+
+def load_font(path, size):
+    font = _fonts.get((path, size))
+    if font is None:
+        font = _fonts[(path, size)] = ImageFont.truetype(path, size)
+    return font
+
+
+def compile_template(template):
+    compiled = _compiled_templates.get(template.key)
+    if compiled is None:
+        compiled = _compiled_templates[template.key] = CompiledTemplate(template)
+        if len(_compiled_templates) > MAX_COMPILED_TEMPLATES:
+            _compiled_templates.popitem(last=False)
+    else:
+        _compiled_templates.move_to_end(template.key)
+    return compiled
+
+
+_encode_buffer = BytesIO()
+
+
+def encode_image(image, image_format=DEFAULT_IMAGE_FORMAT, quality=DEFAULT_IMAGE_QUALITY):
+    """Encode `image` in one of IMAGE_FORMATS through the worker's reusable buffer and return the bytes.
+
+    `quality` is the WebP quality, or for quantised PNGs the share of a 256 colour palette to keep.
+    """
+    _encode_buffer.seek(0)
+    _encode_buffer.truncate()
+
+    if image_format == 'webp':
+        image.save(_encode_buffer, "WEBP", quality=quality, method=4)
+    elif image_format == 'png_quantized':
+        colours = max(2, min(256, 256 * quality // 100))
+        image.quantize(colours, method=Image.Quantize.FASTOCTREE).save(_encode_buffer, "PNG", optimize=True)
+    elif image_format == 'png_optimized':
+        image.save(_encode_buffer, "PNG", optimize=True)
+    else:
+        image.save(_encode_buffer, "PNG")
+    return _encode_buffer.getvalue()
+
+
+def compose_welcome_image(spec):
+    """Draw the welcome image described by `spec`, unencoded."""
+    template = compile_template(spec.template)
+    background = template.base.copy()
+
+    # Paste the avatar inside the ring
+    avatar = Image.open(BytesIO(spec.avatar)).convert("RGBA")
+    avatar = avatar.resize((template.avatar_size, template.avatar_size), Image.LANCZOS)
+    background.paste(avatar, template.avatar_position, template.avatar_mask)
+
+    # Add the welcome text
+    draw = ImageDraw.Draw(background)
+    formatted_text = template.text_overlay.replace("{member}", spec.display_name)  # Replace the placeholder
+
+    text_bbox = draw.textbbox((0, 0), formatted_text, font=template.font)
+    text_width = text_bbox[2] - text_bbox[0]
+    text_position = ((background.width - text_width) // 2, template.text_top)
+    draw.text(text_position, formatted_text, fill=template.text_color, font=template.font)
+    return background
+
+
+def render_welcome_image(spec):
+    """Draw the welcome image described by `spec` and return it encoded. Runs inside a worker process."""
+    return encode_image(compose_welcome_image(spec), spec.template.image_format, spec.template.image_quality)
+
+def render_join_collage(spec):
+    """Draw a grid of the avatars that joined during a burst, with a member count, and return it encoded."""
+    template = compile_template(spec.template)
+    background = template.background.copy()
+    draw = ImageDraw.Draw(background)
+
+    title = f"{spec.member_count} new members have just joined the server"
+    title_bbox = draw.textbbox((0, 0), title, font=template.font)
+    draw.text(((background.width - (title_bbox[2] - title_bbox[0])) // 2, 12), title, fill=template.text_color,
+              font=template.font)
+
+    grid_width = COLLAGE_COLUMNS * COLLAGE_AVATAR_SIZE + (COLLAGE_COLUMNS - 1) * COLLAGE_SPACING
+    left = (background.width - grid_width) // 2
+    top = 50
+    step = COLLAGE_AVATAR_SIZE + COLLAGE_SPACING
+    for index, data in enumerate(spec.avatars[:COLLAGE_MAX_AVATARS]):
+        avatar = Image.open(BytesIO(data)).convert("RGBA")
+        avatar = avatar.resize((COLLAGE_AVATAR_SIZE, COLLAGE_AVATAR_SIZE), Image.LANCZOS)
+        row, column = divmod(index, COLLAGE_COLUMNS)
+        background.paste(avatar, (left + column * step, top + row * step), template.collage_mask)
+
+    hidden = spec.member_count - min(len(spec.avatars), COLLAGE_MAX_AVATARS)
+    if hidden > 0:
+        more = f"+{hidden} more"
+        more_bbox = draw.textbbox((0, 0), more, font=template.font)
+        draw.text(((background.width - (more_bbox[2] - more_bbox[0])) // 2, top + COLLAGE_ROWS * step), more,
+                  fill=template.text_color, font=template.font)
+
+    return encode_image(background, spec.template.image_format, spec.template.image_quality)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Render Pool
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+class RenderPool:
+    """Runs welcome renders in worker processes so PIL never blocks the event loop.
+
+    Renders for a key that is already in flight share the running result. Once `max_pending` renders are queued or
+    running, new ones are dropped and `render` returns None so the caller can fall back to a text-only welcome.
+    """
+
+    def __init__(self, workers=RENDER_WORKERS, max_pending=MAX_PENDING_RENDERS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = None
+        self.in_flight = {}
+        self.dropped = 0
+        self.coalesced = 0
+        self.rendered = 0
+        self.encoded_bytes = 0
+
+    def start(self):
+        if self.executor is not None:
+            return
+
+        # Workers are forked rather than spawned: spawning re-imports bot.py and config.py in every worker, which
+        # would build a second client and truncate the discord log. bot.py starts the pool before the database pool
+        # and HTTP session open, while the process has no other threads, so no worker inherits a lock that another
+        # thread was holding. A pool replacing one whose worker died is forked later, but its workers still only run
+        # PIL code and never touch the locks of the bot's threads.
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("fork"))
+        # Fork all workers now, while the process is still quiet, instead of during the first join
+        self.executor.submit(int)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def discard(self, executor):
+        """Drop a pool whose worker died, so the next render starts a new one instead of failing forever."""
+        if self.executor is executor:
+            logger.error("A welcome render worker died; the render pool will be restarted")
+            self.shutdown()
+
+    async def run(self, func, *args):
+        """Run any picklable CPU-bound function in the pool, outside the render queue limits."""
+        self.start()
+        executor = self.executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            self.discard(executor)
+            raise
+
+    async def render(self, key, spec, renderer=render_welcome_image):
+        running = self.in_flight.get(key)
+        if running is not None:
+            self.coalesced += 1
+            return await asyncio.shield(running)
+
+        if len(self.in_flight) >= self.max_pending:
+            self.dropped += 1
+            logger.warning(f"Welcome render queue full ({self.max_pending}); dropped render for {key}")
+            return None
+
+        self.start()
+        executor = self.executor
+        started = time.perf_counter()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(executor, renderer, spec)
+        except BrokenProcessPool:
+            self.discard(executor)
+            raise
+        self.in_flight[key] = future
+        try:
+            image = await asyncio.shield(future)
+        except BrokenProcessPool:
+            self.discard(executor)
+            raise
+        finally:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+        self.rendered += 1
+        self.encoded_bytes += len(image)
+        logger.debug(f"Rendered welcome image for {key} in {(time.perf_counter() - started) * 1000:.0f}ms "
+                     f"({len(image) / 1024:.1f} KiB)")
+        return image
+
+    def average_size(self):
+        return self.encoded_bytes / self.rendered if self.rendered else 0
+
+
+render_pool = RenderPool()